@@ -14,6 +14,7 @@ from vartrix.container import Container
 from vartrix.namespace import Name_Space
 from vartrix import automate, persist
 from vartrix.aliases import Aliases
+from vartrix.progress import Progress
 
 base = {"alias.one": 5, "alias.two": 7, "alias.three": 11, "alias.four": 17}
 
@@ -735,3 +736,135 @@ class Test_Sequencer(unittest.TestCase):
             {"const_1": 5, "vec_1": 3},
         ]
         self.assertListEqual(label_lst, expected)
+
+
+class Test_Method_Stream(unittest.TestCase):
+    def get_method(self):
+        s = automate.Automation_Set(name="set_1")
+        s.build(data=get_test_data()["set_1"])
+        return s["seq_2"]["method_b"]
+
+    def test_matches_get_lst(self):
+        method = self.get_method()
+        pairs = list(method.stream())
+        self.assertEqual(len(method), 12)
+        self.assertListEqual(
+            [vals for vals, labels in pairs], method.get_lst()
+        )
+        self.assertListEqual(
+            [labels for vals, labels in pairs], method.get_lst(typ="labels")
+        )
+
+    def test_slice(self):
+        method = self.get_method()
+        pairs = list(method.stream())
+        self.assertListEqual(list(method.stream(3, 7)), pairs[3:7])
+
+    def test_large(self):
+        vectors = automate.Vectors()
+        method = automate.Method(name="big")
+        for i in range(6):
+            name = "vec_" + str(i)
+            method.add(vectors.build_one({name: list(range(20))}, name))
+        self.assertEqual(len(method), 20**6)
+        values, labels = next(iter(method.stream(start=21)))
+        self.assertEqual(values["vec_4"], 1)
+        self.assertEqual(values["vec_5"], 1)
+        self.assertEqual(labels["vec_5"], 1)
+
+
+class Test_Parallel_Run(unittest.TestCase):
+    def test_part_range(self):
+        parts = [automate.part_range(10, (w, 3)) for w in range(3)]
+        self.assertEqual([len(r) for r in parts], [3, 3, 4])
+        self.assertEqual([i for r in parts for i in r], list(range(10)))
+        self.assertEqual(automate.part_range(4), range(4))
+
+    def test_workers(self):
+        container = get_c()
+        data = persist.load(get_fname())
+        set_csv_root()
+        a = automate.Automator(container, data=data)
+        serial = Automated("set_1")
+        a.run("set_1", serial)
+        objs = a.run("set_1", Automated("set_1"), workers=3)
+        self.assertEqual(len(objs), 3)
+        for obj in objs:
+            self.assertIs(obj.prepare, True)
+            self.assertIs(obj.finish, True)
+            self.assertEqual(len(obj.prepare_sequence_names), 4)
+            self.assertEqual(len(obj.finish_method_names), 5)
+        for seq_name, methods in serial.alias_one_history.items():
+            for method_name, history in methods.items():
+                combined = []
+                for obj in objs:
+                    combined += obj.alias_one_history[seq_name][method_name]
+                self.assertListEqual(combined, history)
+        self.assertEqual(container, get_c())
+
+    def test_seq_name(self):
+        container = get_c()
+        data = persist.load(get_fname())
+        set_csv_root()
+        a = automate.Automator(container, data=data)
+        objs = a.run("set_1", Automated("set_1"), seq_name="seq_3", workers=2)
+        calls = [len(obj.method_c_calls) for obj in objs]
+        self.assertEqual(calls, [4, 4])
+
+
+class Test_Plan(unittest.TestCase):
+    def get_a(self):
+        data = persist.load(get_fname())
+        set_csv_root()
+        return automate.Automator(get_c(), data=data)
+
+    def test_plan(self):
+        plan = self.get_a().plan("set_1")
+        self.assertDictEqual(
+            plan.counts,
+            {
+                ("seq_1", "method_a"): 4,
+                ("seq_2", "method_b"): 12,
+                ("seq_2", "method_a"): 6,
+                ("seq_3", "method_c"): 8,
+                ("seq_4", "method_c"): 6,
+            },
+        )
+        self.assertEqual(plan.total, 36)
+        self.assertEqual(plan.sequences()["seq_2"], 18)
+        self.assertIn("total", repr(plan))
+        self.assertEqual(self.get_a().plan("set_1", "seq_3").total, 8)
+
+    def test_progress(self):
+        a = self.get_a()
+        calls = []
+        progress = Progress(
+            callback=lambda p: calls.append(p.done), interval=0
+        )
+        a.run("set_1", Automated("set_1"), progress=progress)
+        self.assertEqual(progress.total, 36)
+        self.assertEqual(progress.done, 36)
+        self.assertEqual(calls, list(range(1, 37)))
+        self.assertEqual(progress.fraction, 1.0)
+        self.assertEqual(progress.eta, 0.0)
+        self.assertGreater(progress.rate, 0)
+
+    def test_progress_workers(self):
+        a = self.get_a()
+        calls = []
+        progress = Progress(
+            callback=lambda p: calls.append(p.done), interval=0
+        )
+        a.run("set_1", Automated("set_1"), workers=2, progress=progress)
+        self.assertEqual(progress.total, 36)
+        self.assertEqual(progress.done, 36)
+        self.assertEqual(calls[-1], 36)
+
+    def test_progress_interval(self):
+        calls = []
+        progress = Progress(callback=lambda p: calls.append(p.done))
+        progress.start(total=3)
+        for i in range(3):
+            progress.step()
+        self.assertEqual(calls, [3])
+        self.assertIsNone(Progress().eta)
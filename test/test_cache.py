@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:40:12 2026
+
+@author: Reuben
+"""
+
+import threading
+from pytest import fixture
+import numpy as np
+from vartrix.context import Context
+from vartrix.cache import Result_Cache, function_id, MISSING
+from vartrix import sequence, utils
+
+
+@fixture
+def context1():
+    dct = {"a": 1, "b": 2, "c": np.array([4, 5])}
+    return Context(dct)
+
+
+class Counter:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, context, update_dict):
+        self.calls.append(update_dict)
+        return context["a"] * context["b"]
+
+
+class Scaled:
+    def __init__(self, factor):
+        self.factor = factor
+
+    def __call__(self, context, update_dict):
+        return context["a"] * self.factor
+
+    def method(self, context, update_dict):
+        return context["a"] * self.factor
+
+
+calls = []
+
+
+def counted(context, update_dict):
+    calls.append(update_dict)
+    return context["a"] * context["b"]
+
+
+def multiply(context, update_dict):
+    return context["a"] * context["b"]
+
+
+class Test_Stable_Hash:
+    def test_dict_order(self):
+        assert utils.stable_hash({"a": 1, "b": 2}) == utils.stable_hash(
+            {"b": 2, "a": 1}
+        )
+
+    def test_array(self):
+        h1 = utils.stable_hash(np.array([1, 2]))
+        assert h1 == utils.stable_hash(np.array([1, 2]))
+        assert h1 != utils.stable_hash(np.array([1.0, 2.0]))
+
+    def test_int_float(self):
+        assert utils.stable_hash(1) != utils.stable_hash(1.0)
+
+
+class Test_Result_Cache:
+    def test_function_id(self):
+        assert function_id(multiply).startswith("test.test_cache.multiply|")
+
+    def test_lru(self):
+        cache = Result_Cache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        assert len(cache) == 2
+
+    def test_iterate(self, context1):
+        func = counted
+        del calls[:]
+        cache = Result_Cache()
+        update_dicts = [{"a": 2}, {"a": 3}, {"a": 2}]
+        ret = sequence.iterate(func, context1, update_dicts, cache=cache)
+        assert ret == [4, 6, 4]
+        assert len(calls) == 2
+        ret = context1.iterate(func, update_dicts, cache=cache)
+        assert ret == [4, 6, 4]
+        assert len(calls) == 2
+
+    def test_instances(self, context1):
+        cache = Result_Cache()
+        update_dicts = [{"a": 2}]
+        for func in [Scaled(1).method, Scaled(10).method]:
+            ret = sequence.iterate(func, context1, update_dicts, cache=cache)
+            assert ret == [2 * func.__self__.factor]
+        for func in [Scaled(1), Scaled(10)]:
+            ret = sequence.iterate(func, context1, update_dicts, cache=cache)
+            assert ret == [2 * func.factor]
+        assert len(cache) == 4
+
+    def test_unhashable_instance(self, context1):
+        func = Counter()
+        func.lock = threading.Lock()
+        cache = Result_Cache()
+        update_dicts = [{"a": 2}, {"a": 2}]
+        ret = sequence.iterate(func, context1, update_dicts, cache=cache)
+        assert ret == [4, 4]
+        assert len(func.calls) == 2
+        assert len(cache) == 0
+
+    def test_disk(self, context1, tmp_path):
+        update_dicts = [{"a": 2}, {"a": 3}]
+        cache = Result_Cache(directory=str(tmp_path))
+        sequence.iterate(multiply, context1, update_dicts, cache=cache)
+        cache2 = Result_Cache(directory=str(tmp_path))
+        key = cache2.key(function_id(multiply), context1.with_value("a", 3))
+        assert cache2.get(key) == 6
+
+    def test_process(self, context1, tmp_path):
+        update_dicts = [{"a": 2}, {"a": 3}]
+        cache = Result_Cache(directory=str(tmp_path))
+        ret = sequence.iterate(
+            multiply,
+            context1,
+            update_dicts,
+            cache=cache,
+            workers=2,
+            executor="process",
+        )
+        assert ret == [4, 6]
+        assert len(list(tmp_path.iterdir())) == 2
+
+    def test_disk_eviction(self, tmp_path):
+        cache = Result_Cache(directory=str(tmp_path), max_disk_bytes=300)
+        for i in range(10):
+            cache.set(str(i), list(range(20)))
+        total = sum(p.stat().st_size for p in tmp_path.iterdir())
+        assert total <= 300
+
+
+def make_func(source):
+    namespace = {}
+    exec(source, namespace)
+    return namespace["func"]
+
+
+class Test_Function_Id:
+    def test_constant(self):
+        func_2 = make_func("def func(c, u):\n    return 2 * u['a']")
+        func_3 = make_func("def func(c, u):\n    return 3 * u['a']")
+        assert function_id(func_2) != function_id(func_3)
+        func_2b = make_func("def func(c, u):\n    return 2 * u['a']")
+        assert function_id(func_2) == function_id(func_2b)
+
+    def test_nested_constant(self):
+        src = "def func(c, u):\n    return (lambda: {})()"
+        assert function_id(make_func(src.format(1))) != function_id(
+            make_func(src.format(2))
+        )
+
+    def test_names(self):
+        func_1 = make_func("def func(c, u):\n    return min(u)")
+        func_2 = make_func("def func(c, u):\n    return max(u)")
+        assert function_id(func_1) != function_id(func_2)
+
+    def test_defaults_and_closure(self):
+        func_1 = make_func("def func(c, u, k=1):\n    return k")
+        func_2 = make_func("def func(c, u, k=2):\n    return k")
+        assert function_id(func_1) != function_id(func_2)
+
+        def outer(k):
+            def func(c, u):
+                return k
+
+            return func
+
+        assert function_id(outer(1)) != function_id(outer(2))
+        assert function_id(outer(1)) == function_id(outer(1))
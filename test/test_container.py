@@ -6,9 +6,15 @@ Created on Fri Aug 30 19:31:41 2019
 """
 
 
+import os
+import pickle
+import tempfile
 import unittest
 
+import numpy as np
+
 from vartrix.container import Container
+from vartrix import persist
 
 
 def get_c():
@@ -102,3 +108,396 @@ class Test_Container(unittest.TestCase):
         c.reset()
         dct = {"a.b": 1, "a.c": 2, "d.e": 3, "d.f": 4, "d.g.h": 5, "d.g.i": 6}
         self.assertDictEqual(dct, c)
+
+    def test_pickle(self):
+        c = get_c2()
+        c.lock("a.b")
+        c.subscribe(lambda c, keys: None, prefix="a.")
+        c2 = pickle.loads(pickle.dumps(c))
+        self.assertDictEqual(c, c2)
+        self.assertEqual(c2._locks, {"a.b"})
+
+
+class Test_Observers(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+
+    def callback(self, container, keys):
+        self.events.append(keys)
+
+    def test_key(self):
+        c = get_c2()
+        c.subscribe(self.callback, key="a.b")
+        c.set("a.b", 10)
+        c.set("a.c", 10)
+        self.assertEqual(self.events, [frozenset({"a.b"})])
+
+    def test_prefix(self):
+        c = get_c2()
+        c.subscribe(self.callback, prefix="d.g.")
+        c.set("d.g.h", 10)
+        c.set("d.e", 10)
+        c.set("d.g.i", 10)
+        expected = [frozenset({"d.g.h"}), frozenset({"d.g.i"})]
+        self.assertEqual(self.events, expected)
+
+    def test_dset_batched(self):
+        c = get_c2()
+        c.subscribe(self.callback, prefix="d")
+        c.dset({"a.b": 10, "d.e": 11, "d.g.h": 12})
+        self.assertEqual(self.events, [frozenset({"d.e", "d.g.h"})])
+
+    def test_load(self):
+        c = get_c2()
+        c.subscribe(self.callback, prefix="a.")
+        c.load({"a.c": 5, "a.z": 6})
+        self.assertEqual(self.events, [frozenset({"a.b", "a.c", "a.z"})])
+
+    def test_reset(self):
+        c = get_c2()
+        c.set("a.b", 10)
+        c.subscribe(self.callback, key="a.b")
+        c.reset()
+        self.assertEqual(self.events, [frozenset({"a.b"})])
+
+    def test_batch(self):
+        c = get_c2()
+        c.subscribe(self.callback, prefix="")
+        with c.batch():
+            c.set("a.b", 10)
+            with c.batch():
+                c.set("a.c", 10)
+            self.assertEqual(self.events, [])
+        self.assertEqual(self.events, [frozenset({"a.b", "a.c"})])
+
+    def test_unsubscribe(self):
+        c = get_c2()
+        sub = c.subscribe(self.callback, prefix="a.")
+        c.unsubscribe(sub)
+        c.set("a.b", 10)
+        self.assertEqual(self.events, [])
+
+
+class Test_Index(unittest.TestCase):
+    def test_keys_under(self):
+        c = get_c2()
+        expected = ["d.e", "d.f", "d.g.h", "d.g.i"]
+        self.assertEqual(sorted(c.keys_under("d.")), expected)
+        self.assertEqual(sorted(c.keys_under("d.g")), ["d.g.h", "d.g.i"])
+        self.assertEqual(c.keys_under("z"), [])
+
+    def test_subtree(self):
+        c = get_c2()
+        self.assertDictEqual(c.subtree("d.g"), {"d.g.h": 5, "d.g.i": 6})
+
+    def test_dict_methods(self):
+        c = get_c2()
+        c.subtree("d")
+        self.assertEqual(c.pop("d.g.h"), 5)
+        self.assertEqual(c.pop("d.g.h", None), None)
+        self.assertDictEqual(c.subtree("d.g"), {"d.g.i": 6})
+        c.setdefault("d.g.j", 7)
+        c |= {"d.k": 8}
+        key, val = c.popitem()
+        self.assertEqual(key, "d.k")
+        self.assertDictEqual(c.subtree("d.g"), {"d.g.i": 6, "d.g.j": 7})
+        self.assertEqual(c.keys_under("d.k"), [])
+
+    def test_select(self):
+        c = get_c2()
+        self.assertDictEqual(c.select("*.e"), {"d.e": 3})
+        self.assertDictEqual(c.select("d.*.h"), {"d.g.h": 5})
+        self.assertDictEqual(c.select("**.h"), {"d.g.h": 5})
+        self.assertDictEqual(c.select("a.[bc]"), {"a.b": 1, "a.c": 2})
+
+    def test_incremental(self):
+        c = get_c2()
+        c.keys_under("")
+        c.set("d.g.j", 7)
+        c.dset({"d.g.k": 8})
+        c.add({"d.g.l": 9})
+        del c["d.g.h"]
+        expected = ["d.g.i", "d.g.j", "d.g.k", "d.g.l"]
+        self.assertEqual(sorted(c.keys_under("d.g")), expected)
+        c.load({"x.y": 1})
+        self.assertEqual(c.keys_under("d"), [])
+        self.assertEqual(c.keys_under("x"), ["x.y"])
+
+
+class Test_Transactions(unittest.TestCase):
+    def test_context_error(self):
+        c = get_c2()
+        with self.assertRaises(ValueError):
+            with c.context({"a.b": 10}):
+                c.set("d.e", 11)
+                raise ValueError
+        self.assertEqual(c["a.b"], 1)
+        self.assertEqual(c["d.e"], 11)
+
+    def test_context_keeps_other_writes(self):
+        c = get_c2()
+        with c.context({"a.b": 10}):
+            c.set("a.c", 99)
+            c.set("a.b", 20)
+        self.assertEqual(c["a.b"], 1)
+        self.assertEqual(c["a.c"], 99)
+        self.assertEqual(c._log, [])
+
+    def test_context_in_transaction(self):
+        c = get_c2()
+        with self.assertRaises(ValueError):
+            with c.transaction():
+                with c.context({"a.b": 10}):
+                    c.set("a.c", 99)
+                self.assertEqual(c["a.c"], 99)
+                raise ValueError
+        self.assertDictEqual(c, get_c2())
+
+    def test_context_missing(self):
+        c = get_c2()
+        with self.assertRaises(KeyError):
+            with c.context({"z": 10}):
+                pass
+
+    def test_context_repeated_dset(self):
+        c = get_c2()
+        with c.context({"a.b": 10}):
+            for i in range(100):
+                c.dset({"a.b": i, "a.c": i})
+            self.assertEqual(len(c._log), 2)
+        self.assertEqual(c["a.b"], 1)
+        self.assertEqual(c["a.c"], 99)
+
+    def test_transaction_commit(self):
+        c = get_c2()
+        with c.transaction():
+            c.set("a.b", 10)
+            c.set("z", 5)
+        self.assertEqual(c["a.b"], 10)
+        self.assertEqual(c["z"], 5)
+        self.assertEqual(c._log, [])
+
+    def test_transaction_rollback(self):
+        c = get_c2()
+        with self.assertRaises(ValueError):
+            with c.transaction():
+                c.set("a.b", 10)
+                c.set("z", 5)
+                raise ValueError
+        self.assertDictEqual(c, get_c2())
+        self.assertEqual(c.keys_under("z"), [])
+
+    def test_nested(self):
+        c = get_c2()
+        with c.context({"a.b": 10}):
+            with c.transaction():
+                c.set("a.b", 20)
+                c.set("a.c", 30)
+            with self.assertRaises(ValueError):
+                with c.transaction():
+                    c.set("d.e", 40)
+                    raise ValueError
+            self.assertEqual(c["a.b"], 20)
+            self.assertEqual(c["a.c"], 30)
+            self.assertEqual(c["d.e"], 3)
+        self.assertEqual(c["a.b"], 1)
+        self.assertEqual(c["a.c"], 30)
+
+    def test_load_in_transaction(self):
+        c = get_c2()
+        with self.assertRaises(RuntimeError):
+            with c.transaction():
+                c.load({})
+
+
+class Test_Dset(unittest.TestCase):
+    def test_safe_missing(self):
+        c = get_c2()
+        with self.assertRaises(KeyError):
+            c.dset({"a.b": 10, "z": 5}, safe=True)
+        self.assertEqual(c["a.b"], 1)
+
+    def test_safe_locked(self):
+        c = get_c2()
+        c.lock("a.c")
+        with self.assertRaises(ValueError):
+            c.dset({"a.b": 10, "a.c": 5}, safe=True)
+        self.assertEqual(c["a.b"], 1)
+        c.dset({"a.c": 5})
+        self.assertEqual(c["a.c"], 5)
+
+    def test_aliases(self):
+        c = get_c2()
+        c.set_aliases({"x": "a.b"})
+        c.dset({"x": 10, "a.c": 11}, safe=True)
+        self.assertEqual(c["a.b"], 10)
+        self.assertEqual(c["a.c"], 11)
+        self.assertNotIn("x", dict(c))
+
+    def test_denumpify(self):
+        c = get_c2()
+        c.dset({"a.b": np.array([1, 2]), "a.c": {"d": np.array([3])}})
+        self.assertEqual(c["a.b"], [1, 2])
+        self.assertEqual(c["a.c"], {"d": [3]})
+
+
+class Test_Copy(unittest.TestCase):
+    def test_copy(self):
+        c = get_c2()
+        c2 = c.copy()
+        self.assertDictEqual(c, c2)
+        self.assertIs(c2._backup, c._backup)
+        c2.set("a.b", 10)
+        self.assertEqual(c["a.b"], 1)
+
+    def test_copy_backup(self):
+        c = get_c2()
+        c2 = c.copy()
+        c2.dset({"a.b": 10}, update_backup=True)
+        c2.add({"z": 5})
+        c.set("a.b", 20)
+        c.reset()
+        c2.reset()
+        self.assertEqual(c["a.b"], 1)
+        self.assertNotIn("z", c)
+        self.assertEqual(c2["a.b"], 10)
+        self.assertEqual(c2["z"], 5)
+
+    def test_copy_locks(self):
+        c = get_c2()
+        c.lock("a.b")
+        c2 = c.copy()
+        c2.unlock("a.b")
+        c2.lock("a.c")
+        self.assertEqual(c._locks, {"a.b"})
+        self.assertEqual(c2._locks, {"a.c"})
+
+    def test_snapshot_restore(self):
+        c = get_c2()
+        snapshot = c.snapshot()
+        c.set("a.b", 10)
+        c.set("z", 5)
+        c.lock("a.c")
+        events = []
+        c.subscribe(lambda c, keys: events.append(keys), prefix="")
+        c.restore(snapshot)
+        self.assertDictEqual(c, get_c2())
+        self.assertEqual(c._locks, set())
+        self.assertEqual(events, [frozenset({"a.b", "z"})])
+
+
+class Test_Reset(unittest.TestCase):
+    def test_dirty(self):
+        c = get_c2()
+        self.assertEqual(c.dirty, frozenset())
+        c.set("a.b", 10)
+        c.dset({"z": 5})
+        self.assertEqual(c.dirty, {"a.b", "z"})
+
+    def test_update_backup(self):
+        c = get_c2()
+        c.dset({"a.b": 10, "a.c": 11})
+        c.dset({"a.b": 10}, update_backup=True)
+        self.assertEqual(c.dirty, {"a.c"})
+        c.reset()
+        self.assertEqual(c["a.b"], 10)
+        self.assertEqual(c["a.c"], 2)
+
+    def test_reset_only_dirty(self):
+        c = get_c2()
+        c.set("a.b", 10)
+        c.set("z", 5)
+        c.lock("a.c")
+        events = []
+        c.subscribe(lambda c, keys: events.append(keys), prefix="")
+        c.reset()
+        self.assertDictEqual(c, get_c2())
+        self.assertEqual(events, [frozenset({"a.b", "z"})])
+        self.assertEqual(c.dirty, frozenset())
+        self.assertEqual(c._locks, set())
+
+    def test_reset_deleted(self):
+        c = get_c2()
+        del c["a.b"]
+        c.reset()
+        self.assertDictEqual(c, get_c2())
+
+
+class Test_Native_Arrays(unittest.TestCase):
+    def test_default_lists(self):
+        c = Container({"a": 1})
+        c.set("a", np.array([1, 2]))
+        self.assertEqual(c["a"], [1, 2])
+
+    def test_native(self):
+        c = Container({"a": 1, "b": 2}, native_arrays=True)
+        arr = np.arange(5)
+        c.set("a", arr)
+        c.dset({"b": arr})
+        self.assertIs(c["a"], arr)
+        self.assertIs(c["b"], arr)
+
+    def test_read_only(self):
+        c = Container({"a": 1}, native_arrays=True, read_only_arrays=True)
+        arr = np.arange(5)
+        c.dset({"a": arr})
+        self.assertFalse(c["a"].flags.writeable)
+        self.assertTrue(np.shares_memory(c["a"], arr))
+        self.assertTrue(arr.flags.writeable)
+
+    def test_read_only_load_and_reset(self):
+        arr = np.arange(5)
+        c = Container({"a": arr}, native_arrays=True, read_only_arrays=True)
+        self.assertFalse(c["a"].flags.writeable)
+        c.load({"a": arr, "b": 1})
+        self.assertFalse(c["a"].flags.writeable)
+        c.set("a", np.zeros(2))
+        c.reset()
+        self.assertFalse(c["a"].flags.writeable)
+        np.testing.assert_array_equal(c["a"], arr)
+        c.dset({"b": np.ones(2)}, update_backup=True)
+        c.set("b", 2)
+        c.reset()
+        self.assertFalse(c["b"].flags.writeable)
+        self.assertTrue(arr.flags.writeable)
+
+    def test_copy_keeps_mode(self):
+        c = Container({"a": 1}, native_arrays=True).copy()
+        c.set("a", np.arange(2))
+        self.assertIsInstance(c["a"], np.ndarray)
+
+    def test_save(self):
+        c = Container({"a": 1}, native_arrays=True)
+        c.set("a", np.arange(3))
+        with tempfile.TemporaryDirectory() as tmp:
+            fname = os.path.join(tmp, "c.yml")
+            persist.save(c, fname)
+            self.assertEqual(persist.load(fname), {"a": [0, 1, 2]})
+
+
+class Test_Reset_Dict_Methods(unittest.TestCase):
+    def test_pop(self):
+        c = get_c2()
+        c.pop("a.b")
+        c.popitem()
+        self.assertEqual(c.dirty, {"a.b", "d.g.i"})
+        c.reset()
+        self.assertDictEqual(c, get_c2())
+
+    def test_setdefault(self):
+        c = get_c2()
+        c.setdefault("X", 5)
+        c.setdefault("a.b", 5)
+        c |= {"Y": 6}
+        self.assertEqual(c.dirty, {"X", "Y"})
+        c.reset()
+        self.assertDictEqual(c, get_c2())
+
+    def test_transaction(self):
+        c = get_c2()
+        with self.assertRaises(ValueError):
+            with c.transaction():
+                c.pop("a.b")
+                c.setdefault("X", 5)
+                raise ValueError()
+        self.assertDictEqual(c, get_c2())
@@ -7,8 +7,9 @@ Created on Sun Mar 17 20:45:45 2024
 
 import pytest
 from pytest import approx, fixture
-from vartrix.context import Context
+from vartrix.context import Context, Shared_Context
 import numpy as np
+import pickle
 
 
 @fixture
@@ -75,4 +76,103 @@ class Test_Context:
             {"b": 3, "c": 7},
         ]
         ret = context1.iterate(self.func_test, update_dicts)
-        assert ret == approx(update_dicts)
\ No newline at end of file
+        assert ret == approx(update_dicts)
+
+    def test_read_only_numpy(self, context1):
+        context2 = Context(context1, read_only=True)
+        c = context2.get("c")
+        assert not c.flags.writeable
+        assert np.shares_memory(c, dict.__getitem__(context2, "c"))
+        with pytest.raises(ValueError):
+            c[0] = 67
+
+    def test_read_only_list(self, context1):
+        context2 = Context(context1, read_only=True)
+        b = context2.get("b")
+        assert b == [2, 3]
+        with pytest.raises(TypeError):
+            b[0] = 67
+
+    def test_read_only_dict(self, context1):
+        context2 = Context(context1, read_only=True)
+        d = context2.get("d")
+        assert d == {"e": 5}
+        with pytest.raises(TypeError):
+            d["e"] = 67
+
+    def test_read_only_with_value(self, context1):
+        context2 = Context(context1, read_only=True).with_value("a", 101)
+        with pytest.raises(TypeError):
+            context2["b"][0] = 67
+
+    def test_fingerprint(self, context1):
+        fingerprint = context1.fingerprint
+        assert fingerprint == Context(dict(context1)).fingerprint
+        context2 = context1.with_values({"a": 101, "c": np.array([7, 8])})
+        assert context2.fingerprint != fingerprint
+        assert context2.fingerprint == Context(dict(context2)).fingerprint
+        context3 = context2.with_values({"a": 1, "c": np.array([4, 5])})
+        assert context3.fingerprint == fingerprint
+
+    def test_fingerprint_incremental(self, context1):
+        context1.fingerprint
+        context2 = context1.with_value("a", 101)
+        assert context2._fingerprint is not None
+
+    def test_fingerprint_pickle(self, context1):
+        context1.fingerprint
+        context2 = pickle.loads(pickle.dumps(context1))
+        assert context2._fingerprint == context1._fingerprint
+        assert context2.with_value("a", 2)._fingerprint is not None
+
+
+class Test_Shared_Context:
+    def test_with_values(self, context1):
+        shared = context1.shared()
+        context2 = shared.with_values({"a": 101, "b": [31, 32]})
+        assert isinstance(context2, Shared_Context)
+        assert shared["a"] == 1
+        assert context2["a"] == 101
+        assert context2["b"] == [31, 32]
+        assert context2["c"] == approx([4, 5])
+
+    def test_shares_parent(self, context1):
+        shared = context1.shared()
+        context2 = shared.with_value("a", 101)
+        assert dict.__len__(context2) == 1
+        assert len(context2) == len(context1)
+        assert list(context2.keys()) == list(context1.keys())
+
+    def test_get_copy_list(self, context1):
+        context2 = context1.shared().with_value("a", 101)
+        b = context2.get("b")
+        b[0] = 67
+        assert context2["b"][0] == 2
+
+    def test_unsafe_new_key(self, context1):
+        context2 = context1.shared().with_value("z", 9, safe=False)
+        assert "z" in context2
+        assert len(context2) == len(context1) + 1
+        assert dict(context2)["z"] == 9
+
+    def test_flattens(self, context1):
+        context2 = context1.shared()
+        for i in range(Shared_Context.max_depth + 2):
+            context2 = context2.with_value("a", i)
+        assert context2._depth <= Shared_Context.max_depth
+        assert context2["a"] == Shared_Context.max_depth + 1
+
+    def test_iterate(self, context1):
+        update_dicts = [{"a": 2}, {"a": 3}]
+        ret = context1.shared().iterate(lambda c, u: c["a"], update_dicts)
+        assert ret == [2, 3]
+
+    def test_fingerprint(self, context1):
+        shared = context1.shared()
+        shared.fingerprint
+        context2 = shared
+        for i in range(Shared_Context.max_depth + 2):
+            context2 = context2.with_values({"a": i, "b": [i]})
+            assert len(context2._digests) <= len(context1)
+        expected = context1.with_values({"a": i, "b": [i]}).fingerprint
+        assert context2.fingerprint == expected
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:40:08 2026
+
+@author: Reuben
+"""
+
+import io
+import os
+import unittest
+from contextlib import redirect_stdout
+
+from vartrix import automate, instrument, persist
+from vartrix.container import Container
+
+root = os.path.dirname(os.path.abspath(__file__))
+base = {"alias.one": 5, "alias.two": 7, "alias.three": 11, "alias.four": 17}
+
+
+class Automated:
+    def method_a(self, seq_name, val_dct, label_dct):
+        pass
+
+    def method_b(self, seq_name, val_dct, label_dct):
+        pass
+
+    def method_c(self, seq_name, val_dct, label_dct):
+        pass
+
+
+class Recorder(instrument.Listener):
+    def __init__(self):
+        self.events = []
+        self.durations = []
+
+    def set_start(self, info):
+        self.events.append(("set_start", info["set"]))
+
+    def set_end(self, info, duration):
+        self.events.append(("set_end", info["set"]))
+
+    def sequence_start(self, info):
+        self.events.append(("sequence_start", info["sequence"]))
+
+    def sequence_end(self, info, duration):
+        self.events.append(("sequence_end", info["sequence"]))
+
+    def method_start(self, info, n):
+        self.events.append(("method_start", info["method"], n))
+
+    def method_end(self, info, duration):
+        self.events.append(("method_end", info["method"]))
+
+    def iteration_start(self, info, i, label_dct):
+        self.events.append(("iteration_start", i, dict(label_dct)))
+
+    def iteration_end(self, info, i, label_dct, duration):
+        self.durations.append(duration)
+        self.events.append(("iteration_end", i))
+
+
+def get_a():
+    automate.set_root(root)
+    data = persist.load(os.path.join(root, "automation_sets.yml"))
+    return automate.Automator(Container(base), data=data)
+
+
+class Test_Listeners(unittest.TestCase):
+    def test_none_active(self):
+        self.assertIsNone(instrument.active())
+
+    def test_events(self):
+        with instrument.listening(Recorder()) as recorder:
+            self.assertIsNotNone(instrument.active())
+            get_a().run("set_2", Automated(), seq_name="seq_11")
+        self.assertIsNone(instrument.active())
+        labels = [{"const_1": 5, "vec_1": i} for i in (1, 2, 3)]
+        expected = [
+            ("set_start", "set_2"),
+            ("sequence_start", "seq_11"),
+            ("method_start", "method_a", 3),
+        ]
+        for i, label_dct in enumerate(labels, 1):
+            expected.append(("iteration_start", i, label_dct))
+            expected.append(("iteration_end", i))
+        expected += [
+            ("method_end", "method_a"),
+            ("sequence_end", "seq_11"),
+            ("set_end", "set_2"),
+        ]
+        self.assertListEqual(recorder.events, expected)
+        self.assertTrue(all(d >= 0 for d in recorder.durations))
+
+    def test_timing_collector(self):
+        with instrument.listening(instrument.Timing_Collector()) as collector:
+            get_a().run("set_1", Automated())
+        summary = collector.summary()
+        self.assertEqual(len(summary), 5)
+        stats = summary[("set_1", "seq_2", "method_b")]
+        self.assertEqual(stats["count"], 12)
+        self.assertEqual(sum(stats["histogram"].values()), 12)
+        self.assertLessEqual(stats["min"], stats["mean"])
+        self.assertLessEqual(stats["mean"], stats["max"])
+
+    def test_bucket(self):
+        self.assertEqual(instrument.bucket(1.0), 1)
+        self.assertEqual(instrument.bucket(0.75), 0)
+        self.assertEqual(instrument.bucket(0.001), -9)
+        self.assertIsNone(instrument.bucket(0.0))
+
+    def test_print_listener(self):
+        f = io.StringIO()
+        with redirect_stdout(f):
+            with instrument.listening(instrument.Print_Listener()):
+                get_a().run("set_2", Automated(), seq_name="seq_10")
+        out = f.getvalue()
+        self.assertIn('100.00% Executing "method_a"', out)
+        self.assertIn("const_2: ", out)
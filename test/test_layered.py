@@ -0,0 +1,127 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:31:52 2026
+
+@author: Reuben
+"""
+
+import gc
+import pickle
+import unittest
+
+from vartrix.container import Container
+from vartrix.layered import Layered_Container
+
+
+def get_layers():
+    defaults = Container({"a.b": 1, "a.c": 2, "d": 3})
+    site = Container({"a.c": 20})
+    scenario = Container({"d": 300, "e": 4})
+    return defaults, site, scenario
+
+
+class Test_Layered_Container(unittest.TestCase):
+    def test_lookup(self):
+        layered = Layered_Container(get_layers())
+        self.assertEqual(layered["a.b"], 1)
+        self.assertEqual(layered["a.c"], 20)
+        self.assertEqual(layered["d"], 300)
+        self.assertNotIn("x", layered)
+        with self.assertRaises(KeyError):
+            layered["x"]
+        self.assertEqual(len(layered), 4)
+        self.assertEqual(list(layered), ["a.b", "a.c", "d", "e"])
+
+    def test_flatten_matches_merge(self):
+        layers = get_layers()
+        layered = Layered_Container(layers)
+        flat = layered.flatten()
+        self.assertIsInstance(flat, Container)
+        self.assertEqual(flat, Container.merge(layers))
+        self.assertEqual(layered.to_dict(), dict(flat))
+
+    def test_flatten_cached(self):
+        defaults, site, scenario = get_layers()
+        layered = Layered_Container([defaults, site, scenario])
+        layered.flatten()
+        cached = layered._flat
+        layered.flatten()
+        self.assertIs(layered._flat, cached)
+        defaults["a.b"] = 10
+        self.assertIsNone(layered._flat)
+        self.assertEqual(layered.flatten()["a.b"], 10)
+        site.dset({"a.c": 30})
+        self.assertEqual(layered["a.c"], 30)
+
+    def test_flatten_copy(self):
+        layered = Layered_Container(get_layers())
+        flat = layered.flatten()
+        flat["a.b"] = 5
+        self.assertEqual(layered["a.b"], 1)
+        self.assertEqual(layered.flatten()["a.b"], 1)
+
+    def test_write_top(self):
+        defaults, site, scenario = get_layers()
+        layered = Layered_Container([defaults, site, scenario])
+        layered.flatten()
+        layered["a.b"] = 7
+        self.assertEqual(scenario["a.b"], 7)
+        self.assertEqual(defaults["a.b"], 1)
+        self.assertEqual(layered["a.b"], 7)
+        del layered["a.b"]
+        self.assertEqual(layered["a.b"], 1)
+        self.assertIs(layered.layer_of("a.c"), site)
+
+    def test_mapping_methods(self):
+        defaults, site, scenario = get_layers()
+        layered = Layered_Container([defaults, site, scenario])
+        self.assertEqual(layered.pop("d"), 300)
+        self.assertEqual(layered["d"], 3)
+        self.assertEqual(layered.pop("a.b", None), None)
+        with self.assertRaises(KeyError):
+            layered.pop("a.b")
+        self.assertEqual(layered.popitem(), ("e", 4))
+        layered["x"] = 1
+        layered.clear()
+        self.assertEqual(len(scenario), 0)
+        self.assertEqual(layered["a.c"], 20)
+
+    def test_push_pop(self):
+        defaults, site, scenario = get_layers()
+        layered = Layered_Container([defaults, site])
+        layered.flatten()
+        layered.push_layer({"a.b": 100})
+        self.assertEqual(layered["a.b"], 100)
+        self.assertIsInstance(layered.top, Container)
+        layered.pop_layer()
+        self.assertEqual(layered["a.b"], 1)
+        layered.close()
+        self.assertEqual(layered.layers, ())
+        self.assertFalse(defaults._observers)
+
+    def test_dropped_stacks(self):
+        base = Container({"a.b": 1})
+        for i in range(100):
+            layered = Layered_Container([base, {"a.b": i}])
+            self.assertEqual(layered["a.b"], i)
+        del layered
+        gc.collect()
+        self.assertFalse(base._observers)
+        base["a.b"] = 2
+
+    def test_push_after_close(self):
+        base = Container({"a.b": 1})
+        layered = Layered_Container([base])
+        layered.close()
+        layered.push_layer(base)
+        self.assertTrue(base._observers)
+        del layered
+        gc.collect()
+        self.assertFalse(base._observers)
+
+    def test_pickle(self):
+        layered = Layered_Container(get_layers())
+        new = pickle.loads(pickle.dumps(layered))
+        self.assertEqual(dict(new), dict(layered))
+        new.layers[0]["a.b"] = 9
+        self.assertEqual(new["a.b"], 9)
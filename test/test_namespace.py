@@ -54,3 +54,13 @@ class Test_get_container(unittest.TestCase):
         container1 = get_container("test2")
         container2 = get_container("test2")
         self.assertTrue(container1 is container2)
+
+
+class Test_Duplicate(unittest.TestCase):
+    def test_duplicate(self):
+        ns = Name_Space(obj_cls=Container)
+        container = ns.create("test", dct={"a.b": 5})
+        new = ns.duplicate("test", "test2")
+        self.assertIs(ns["test2"], new)
+        new.set("a.b", 6)
+        self.assertEqual(container["a.b"], 5)
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:58:31 2026
+
+@author: Reuben
+"""
+
+import threading
+import pytest
+from pytest import approx, fixture
+from vartrix.context import Context
+from vartrix import sequence, reducers
+
+
+@fixture
+def context1():
+    return Context({"a": 1, "b": 2})
+
+
+def func(context, update_dict):
+    return (context["a"] - 3) ** 2 + context["b"]
+
+
+def get_combs():
+    return sequence.Combinations.from_dict({"a": range(7), "b": [4, 5, 6]})
+
+
+def expected():
+    return [func(Context(d), d) for d in get_combs()]
+
+
+class Test_Reducers:
+    def test_min_max(self, context1):
+        combs = get_combs()
+        assert context1.iterate(func, combs, reduce=reducers.Min()) == min(
+            expected()
+        )
+        assert context1.iterate(func, combs, reduce=reducers.Max()) == max(
+            expected()
+        )
+
+    def test_sum_count_mean(self, context1):
+        combs = get_combs()
+        vals = expected()
+        total = context1.iterate(func, combs, reduce=reducers.Sum())
+        assert total == sum(vals)
+        assert context1.iterate(func, combs, reduce=reducers.Count()) == 21
+        mean = context1.iterate(func, combs, reduce=reducers.Mean())
+        assert mean == approx(sum(vals) / len(vals))
+
+    def test_argmin(self, context1):
+        combs = get_combs()
+        value, update_dict = context1.iterate(
+            func, combs, reduce=reducers.Argmin()
+        )
+        assert value == 4
+        assert update_dict == {"a": 3, "b": 4}
+
+    def test_argmax_key(self, context1):
+        combs = get_combs()
+        reducer = reducers.Argmax(key=lambda r: -r)
+        value, update_dict = context1.iterate(func, combs, reduce=reducer)
+        assert value == -4
+        assert update_dict == {"a": 3, "b": 4}
+
+    def test_empty(self, context1):
+        assert context1.iterate(func, [], reduce=reducers.Mean()) is None
+        assert context1.iterate(func, [], reduce=reducers.Min()) is None
+
+    def test_tree(self):
+        tree = reducers.Tree(reducers.Sum())
+        for i in range(100):
+            tree.push(i)
+            assert len(tree._stack) <= 8
+        assert tree.result() == sum(range(100))
+
+    def test_parallel(self, context1):
+        combs = get_combs()
+        for executor in ["thread", "process"]:
+            value, update_dict = sequence.iterate(
+                func,
+                context1,
+                combs,
+                workers=3,
+                executor=executor,
+                chunksize=2,
+                reduce=reducers.Argmin(),
+            )
+            assert update_dict == {"a": 3, "b": 4}
+            mean = sequence.iterate(
+                func,
+                context1,
+                combs,
+                workers=3,
+                executor=executor,
+                reduce=reducers.Mean(),
+            )
+            assert mean == approx(sum(expected()) / 21)
+
+    def test_reducer_error(self, context1):
+        class Failing(reducers.Sum):
+            def combine(self, a, b):
+                if threading.current_thread() is threading.main_thread():
+                    raise ValueError("combine in Tree")
+                return super().combine(a, b)
+
+        n_threads = threading.active_count()
+        with pytest.raises(ValueError) as excinfo:
+            sequence.iterate(
+                func, context1, get_combs(), workers=2, reduce=Failing()
+            )
+        # The traceback keeps the frames alive, so the pool must already
+        # have been shut down
+        assert excinfo.traceback
+        assert threading.active_count() == n_threads
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:48:09 2026
+
+@author: Reuben
+"""
+
+import os
+import pickle
+import time
+import pytest
+from pytest import fixture
+import numpy as np
+from vartrix.context import Context
+from vartrix.container import Container
+from vartrix.persist import is_importable
+from vartrix.progress import Progress
+from vartrix import sequence, results, automate, persist
+
+root = os.path.dirname(os.path.abspath(__file__))
+base = {"alias.one": 5, "alias.two": 7, "alias.three": 11, "alias.four": 17}
+
+
+@fixture
+def context1():
+    return Context({"a": 1, "b": 2})
+
+
+def func(context, update_dict):
+    return np.float64(context["a"] * context["b"])
+
+
+def get_combs():
+    return sequence.Combinations.from_dict({"a": [1, 2, 3], "b": [4, 5]})
+
+
+class Test_Iterate_Stream:
+    def test_stream(self, context1):
+        combs = get_combs()
+        out = list(sequence.iterate_stream(func, context1, combs))
+        assert out == [(d, d["a"] * d["b"]) for d in combs]
+
+    def test_parallel(self, context1):
+        combs = get_combs()
+        out = list(context1.iterate_stream(func, combs, workers=2))
+        assert out == [(d, d["a"] * d["b"]) for d in combs]
+
+
+class Test_Sinks:
+    def check(self, sink_cls, path, context1):
+        combs = get_combs()
+        with sink_cls(path, chunk_size=4) as sink:
+            stream = sequence.iterate_stream(func, context1, combs, sink=sink)
+            for pair in stream:
+                assert len(sink._buffer) < 4
+        out = list(sink_cls.read(path))
+        assert [d for d, r in out] == list(combs)
+        assert [r for d, r in out] == [d["a"] * d["b"] for d in combs]
+
+    def test_jsonl(self, context1, tmp_path):
+        self.check(results.Jsonl_Sink, str(tmp_path / "r.jsonl"), context1)
+
+    def test_jsonl_partial_line(self, tmp_path):
+        path = str(tmp_path / "r.jsonl")
+        sink = results.Jsonl_Sink(path)
+        sink.write({"a": 1}, 2)
+        sink.flush()
+        with open(path, "a") as f:
+            f.write('{"update_dict": {"a"')
+        assert list(results.Jsonl_Sink.read(path)) == [({"a": 1}, 2)]
+
+    def test_npz(self, context1, tmp_path):
+        path = str(tmp_path / "r")
+        self.check(results.Npz_Sink, path, context1)
+        assert len(os.listdir(tmp_path)) == 2
+
+    def test_npz_resume(self, tmp_path):
+        path = str(tmp_path / "r")
+        with results.Npz_Sink(path) as sink:
+            sink.write({"a": 1}, 2)
+        with results.Npz_Sink(path) as sink:
+            sink.write({"a": 2}, 3)
+        expected = [({"a": 1}, 2), ({"a": 2}, 3)]
+        assert list(results.Npz_Sink.read(path)) == expected
+
+    @pytest.mark.skipif(not is_importable("pyarrow"), reason="needs pyarrow")
+    def test_parquet(self, context1, tmp_path):
+        self.check(results.Parquet_Sink, str(tmp_path / "r"), context1)
+
+
+class Automated:
+    def __init__(self, container, fail_after=None, delay=0):
+        self.params = container
+        self.delay = delay
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def call(self, seq_name, val_dct, label_dct):
+        time.sleep(self.delay)
+        if self.calls == self.fail_after:
+            raise RuntimeError("Interrupted")
+        self.calls += 1
+        return self.params["alias.one"] * 100 + self.params["alias.four"]
+
+    method_a = method_b = method_c = call
+
+
+def get_automator():
+    automate.set_root(root)
+    data = persist.load(os.path.join(root, "automation_sets.yml"))
+    return automate.Automator(Container(base), data=data)
+
+
+class Test_Sqlite_Store:
+    def test_store(self, tmp_path):
+        a = get_automator()
+        with results.Sqlite_Store(str(tmp_path / "r.db")) as store:
+            a.run("set_1", Automated(a.container), store=store)
+            assert len(store) == 36
+            out = list(store.query(sequence="seq_3", method="method_c"))
+            assert len(out) == 8
+            assert out[0] == ({"vec_1": 0, "vec_3": "four"}, 4)
+            out = list(store.query(params={"alias.one": 2}))
+            assert len(out) == 1 + 3 + 2
+            assert all(value // 100 == 2 for labels, value in out)
+            params = {"alias.one": 2, "alias.four": 5}
+            out = store.query("set_1", params=params)
+            assert [value for labels, value in out] == [205]
+
+    def test_resume(self, tmp_path):
+        path = str(tmp_path / "r.db")
+        a = get_automator()
+        obj = Automated(a.container, fail_after=20)
+        with pytest.raises(RuntimeError):
+            a.run("set_1", obj, store=results.Sqlite_Store(path))
+        store = results.Sqlite_Store(path)
+        assert len(store) == 20
+        obj = Automated(a.container)
+        progress = Progress()
+        a.run("set_1", obj, store=store, progress=progress)
+        assert obj.calls == 16
+        assert progress.total == 16
+        assert progress.done == 16
+        assert len(store) == 36
+        obj = Automated(a.container)
+        a.run("set_1", obj, store=store)
+        assert obj.calls == 0
+        assert a.container == Container(base)
+
+    def test_pickle(self, tmp_path):
+        store = results.Sqlite_Store(str(tmp_path / "r.db"), timeout=5)
+        len(store)
+        new = pickle.loads(pickle.dumps(store))
+        assert new.path == store.path
+        assert new.timeout == 5
+        assert new._conn is None
+        store.close()
+
+    def test_workers(self, tmp_path):
+        a = get_automator()
+        store = results.Sqlite_Store(str(tmp_path / "r.db"))
+        objs = a.run("set_1", Automated(a.container), workers=2, store=store)
+        assert sum(obj.calls for obj in objs) == 36
+        assert len(store) == 36
+        store.close()
+
+    def test_overlapping_writers(self, tmp_path):
+        path = str(tmp_path / "r.db")
+        store_1 = results.Sqlite_Store(path, timeout=0.5)
+        store_2 = results.Sqlite_Store(path, timeout=0.5)
+        for i in range(3):
+            store_1.add("s", "q", "m", {"v": i}, {"a": i}, i)
+            store_2.add("s", "q", "m", {"v": -i - 1}, {"a": i}, i)
+        assert len(store_1) == 6
+        assert len(store_2) == 6
+        store_1.close()
+        store_2.close()
+
+    def test_workers_overlap(self, tmp_path):
+        a = get_automator()
+        store = results.Sqlite_Store(str(tmp_path / "r.db"), timeout=1)
+        obj = Automated(a.container, delay=0.02)
+        objs = a.run("set_1", obj, workers=3, store=store)
+        assert sum(obj.calls for obj in objs) == 36
+        assert len(store) == 36
+        store.close()
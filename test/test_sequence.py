@@ -10,6 +10,7 @@ from pytest import approx, fixture
 from vartrix.context import Context
 from vartrix import sequence
 import numpy as np
+import asyncio
 
 
 @fixture
@@ -75,3 +76,211 @@ class Test_Sequence:
         ]
         ret = sequence.iterate(self.func_test, context1, update_dicts)
         assert ret == approx(update_dicts)
+
+
+class Test_Combinations:
+    def test_from_lists(self):
+        lst = [[{"a": 5}, {"a": 4}], [{"b": 2, "c": 6}, {"b": 3, "c": 7}]]
+        combs = sequence.Combinations.from_lists(lst)
+        assert len(combs) == 4
+        assert list(combs) == sequence.combinations_from_lists(lst)
+
+    def test_from_dict(self):
+        dct = {"b": [2, 3], "c": [6, 7, 8]}
+        combs = sequence.Combinations.from_dict(dct)
+        expected = sequence.combinations_from_dict(dct)
+        assert [combs[i] for i in range(len(combs))] == expected
+
+    def test_from_dicts(self):
+        dicts = [{"a": [4, 5]}, {"b": [2, 3], "c": [6, 7]}]
+        combs = sequence.Combinations.from_dicts(dicts)
+        assert list(combs) == sequence.combinations(dicts)
+
+    def test_getitem_negative(self):
+        combs = sequence.Combinations.from_dict({"b": [2, 3], "c": [6, 7]})
+        assert combs[-1] == {"b": 3, "c": 7}
+        with pytest.raises(IndexError):
+            combs[4]
+
+    def test_slice(self):
+        dct = {"a": [1, 2, 3], "b": [4, 5], "c": [6, 7]}
+        combs = sequence.Combinations.from_dict(dct)
+        expected = sequence.combinations_from_dict(dct)
+        assert list(combs[3:10:2]) == expected[3:10:2]
+        assert len(combs[3:10:2]) == len(expected[3:10:2])
+
+    def test_large(self):
+        dct = {k: list(range(100)) for k in "abcd"}
+        combs = sequence.Combinations.from_dict(dct)
+        assert len(combs) == 10**8
+        assert combs[123456] == {"a": 0, "b": 12, "c": 34, "d": 56}
+
+    def test_iterate(self, context1):
+        combs = sequence.Combinations.from_dict({"b": [2, 3], "c": [6, 7]})
+        ret = sequence.iterate(lambda c, u: c["b"] * c["c"], context1, combs)
+        assert ret == [12, 14, 18, 21]
+        assert context1.iterate(lambda c, u: u, combs) == list(combs)
+
+
+def square_b(context, update_dict):
+    return context["b"] ** 2
+
+
+class Pickle_Counter:
+    count = 0
+
+    def __reduce__(self):
+        Pickle_Counter.count += 1
+        return (Pickle_Counter, ())
+
+
+class Test_Iterate_Parallel:
+    def update_dicts(self):
+        return sequence.Combinations.from_dict({"b": list(range(20))})
+
+    def test_thread(self, context1):
+        update_dicts = self.update_dicts()
+        ret = sequence.iterate(square_b, context1, update_dicts, workers=4)
+        assert ret == [b**2 for b in range(20)]
+
+    def test_process(self, context1):
+        update_dicts = self.update_dicts()
+        ret = context1.iterate(
+            square_b, update_dicts, workers=2, executor="process", chunksize=3
+        )
+        assert ret == [b**2 for b in range(20)]
+
+    def test_unordered(self, context1):
+        update_dicts = self.update_dicts()
+        ret = sequence.iterate(
+            square_b, context1, update_dicts, workers=4, ordered=False
+        )
+        assert sorted(r for u, r in ret) == [b**2 for b in range(20)]
+        assert all(r == u["b"] ** 2 for u, r in ret)
+
+    def test_process_context_sent_once(self, context1):
+        counter = Pickle_Counter()
+        context = Context(dict(context1, counter=counter))
+        Pickle_Counter.count = 0
+        ret = sequence.iterate(
+            square_b,
+            context,
+            self.update_dicts(),
+            workers=2,
+            executor="process",
+        )
+        assert ret == [b**2 for b in range(20)]
+        assert Pickle_Counter.count <= 2
+
+    def test_shared_context_process(self, context1):
+        shared = context1.shared().with_value("a", 10)
+        ret = sequence.iterate(
+            square_b, shared, [{"b": 3}], workers=1, executor="process"
+        )
+        assert ret == [9]
+
+
+class Test_Grid:
+    def test_grid(self):
+        dicts = [{"a": [4, 5]}, {"b": [2, 3], "c": [6, 7]}]
+        out = sequence.grid(dicts)
+        expected = sequence.combinations(dicts)
+        for k in ["a", "b", "c"]:
+            assert list(out[k]) == [d[k] for d in expected]
+
+    def test_grid_from_dict(self):
+        dct = {"b": [2.0, 3.0], "c": [6.0, 7.0, 8.0]}
+        out = sequence.grid_from_dict(dct)
+        expected = sequence.combinations_from_dict(dct)
+        assert list(out["b"]) == [d["b"] for d in expected]
+        assert list(out["c"]) == [d["c"] for d in expected]
+
+    def test_structured(self):
+        dct = {"b": [2.0, 3.0], "c": [6, 7]}
+        out = sequence.grid_from_dict(dct, structured=True)
+        assert out.dtype.names == ("b", "c")
+        assert list(out["c"]) == [6, 7, 6, 7]
+
+    def test_iterate_batches(self, context1):
+        grid = sequence.grid_from_dict({"b": [2, 3], "c": [6, 7]})
+
+        def func(context, batch):
+            return context["b"] * context["c"] + context["a"]
+
+        ret = sequence.iterate_batches(func, context1, grid, batch_size=3)
+        assert len(ret) == 2
+        assert list(np.concatenate(ret)) == [13, 15, 19, 22]
+
+    def test_empty(self, context1):
+        assert sequence.grid([]) == {}
+        assert len(sequence.grid([], structured=True)) == 0
+        with pytest.raises(ValueError):
+            sequence.grid([{"a": [1, 2]}, {}])
+        assert sequence.iterate_batches(lambda c, b: 1, context1, {}) == []
+
+    def test_batch_size(self, context1):
+        grid = sequence.grid_from_dict({"b": [2, 3]})
+        for batch_size in [0, -1]:
+            with pytest.raises(ValueError):
+                sequence.iterate_batches(
+                    lambda c, b: 1, context1, grid, batch_size=batch_size
+                )
+
+    def test_iterate_batches_structured(self, context1):
+        grid = sequence.grid_from_dict({"b": [2, 3]}, structured=True)
+        ret = context1.iterate_batches(lambda c, b: c["b"] * 2, grid)
+        assert list(ret[0]) == [4, 6]
+
+
+class Test_Aiterate:
+    def test_ordered(self, context1):
+        async def func(context, update_dict):
+            await asyncio.sleep(0.001 * (5 - context["b"]))
+            return context["b"]
+
+        async def run():
+            update_dicts = [{"b": b} for b in range(5)]
+            gen = sequence.aiterate(func, context1, update_dicts, 2)
+            return [ret async for ret in gen]
+
+        assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+    def test_concurrency(self, context1):
+        running = []
+        peak = []
+
+        async def func(context, update_dict):
+            running.append(1)
+            peak.append(len(running))
+            await asyncio.sleep(0.001)
+            running.pop()
+            return update_dict
+
+        async def run():
+            update_dicts = [{"b": b} for b in range(10)]
+            gen = context1.aiterate(func, update_dicts, concurrency=3)
+            return [ret async for ret in gen]
+
+        assert asyncio.run(run()) == [{"b": b} for b in range(10)]
+        assert max(peak) == 3
+
+    def test_cancel(self, context1):
+        cancelled = []
+
+        async def func(context, update_dict):
+            try:
+                await asyncio.sleep(10 if context["b"] else 0)
+            except asyncio.CancelledError:
+                cancelled.append(context["b"])
+                raise
+            return context["b"]
+
+        async def run():
+            update_dicts = [{"b": b} for b in range(4)]
+            gen = sequence.aiterate(func, context1, update_dicts, 4)
+            first = await gen.__anext__()
+            await gen.aclose()
+            return first
+
+        assert asyncio.run(run()) == 0
+        assert sorted(cancelled) == [1, 2, 3]
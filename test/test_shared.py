@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:02:17 2026
+
+@author: Reuben
+"""
+
+import pickle
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from vartrix.container import Container
+from vartrix.shared import Shared_Memory_Manager, Shared_Container
+
+
+def get_c():
+    big = np.arange(10000, dtype=float)
+    return Container({"a.b": 1, "a.c": [1.0, 2.0], "big": big})
+
+
+def total(container):
+    arr = container["big"]
+    return float(arr.sum()), arr.flags.writeable
+
+
+class Test_Shared_Memory_Manager(unittest.TestCase):
+    def test_share(self):
+        with Shared_Memory_Manager() as manager:
+            shared = manager.share(get_c())
+            self.assertIsInstance(shared, Shared_Container)
+            self.assertFalse(shared["big"].flags.writeable)
+            self.assertEqual(shared["a.c"], [1.0, 2.0])
+            self.assertEqual(len(manager._blocks), 1)
+
+    def test_pickle_small(self):
+        with Shared_Memory_Manager() as manager:
+            shared = manager.share(get_c())
+            data = pickle.dumps(shared)
+            self.assertLess(len(data), 2000)
+            new = pickle.loads(data)
+            self.assertEqual(new["big"][-1], 9999.0)
+            self.assertLess(len(pickle.dumps(new)), 2000)
+            self.assertIs(new._backup["big"], new["big"])
+            new["big"] = np.zeros(2)
+            new.reset()
+            self.assertEqual(new["big"][-1], 9999.0)
+            del new
+
+    def test_copy(self):
+        with Shared_Memory_Manager() as manager:
+            shared = manager.share(get_c())
+            new = shared.copy()
+            self.assertIsInstance(new, Shared_Container)
+            self.assertLess(len(pickle.dumps(new)), 2000)
+            new["big"] = np.zeros(2)
+            restored = pickle.loads(pickle.dumps(new))
+            self.assertEqual(list(restored["big"]), [0, 0])
+            self.assertEqual(restored._backup["big"][-1], 9999.0)
+            self.assertLess(len(pickle.dumps(shared)), 2000)
+
+    def test_backup_shared(self):
+        with Shared_Memory_Manager() as manager:
+            shared = manager.share(get_c())
+            self.assertIs(shared._backup["big"], shared["big"])
+            shared["big"] = np.zeros(2)
+            self.assertLess(len(pickle.dumps(shared)), 2000)
+            shared.reset()
+            self.assertEqual(shared["big"][-1], 9999.0)
+
+    def test_replaced_value(self):
+        with Shared_Memory_Manager() as manager:
+            shared = manager.share(get_c())
+            dict.__setitem__(shared, "big", np.zeros(3))
+            new = pickle.loads(pickle.dumps(shared))
+            self.assertEqual(list(new["big"]), [0, 0, 0])
+
+    def test_lists(self):
+        c = Container({"a": list(range(1000)), "b": ["x"] * 1000})
+        with Shared_Memory_Manager(lists=True) as manager:
+            shared = manager.share(c)
+            self.assertIsInstance(shared["a"], np.ndarray)
+            self.assertIsInstance(shared["b"], list)
+
+    def test_process_pool(self):
+        with Shared_Memory_Manager() as manager:
+            shared = manager.share(get_c())
+            with ProcessPoolExecutor(2) as pool:
+                out = list(pool.map(total, [shared] * 3))
+        self.assertEqual(out, [(sum(range(10000)), False)] * 3)
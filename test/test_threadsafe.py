@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:52:40 2026
+
+@author: Reuben
+"""
+
+import pickle
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from vartrix import threadsafe
+from vartrix.threadsafe import Concurrent_Container, RW_Lock
+
+
+def get_c():
+    return Concurrent_Container({"a.b": 1, "a.c": 2, "d.e": 3})
+
+
+class Test_RW_Lock(unittest.TestCase):
+    def test_readers_share(self):
+        lock = RW_Lock()
+        with lock.read():
+            with lock.read():
+                self.assertEqual(lock._readers, 2)
+
+    def test_writer_reentrant(self):
+        lock = RW_Lock()
+        with lock.write():
+            with lock.write():
+                with lock.read():
+                    pass
+        self.assertIsNone(lock._writer)
+
+    def test_writer_excludes(self):
+        lock = RW_Lock()
+        with lock.read():
+            t = threading.Thread(target=lambda: lock.write().__enter__())
+            t.start()
+            t.join(0.05)
+            self.assertTrue(t.is_alive())
+        t.join(1)
+        self.assertFalse(t.is_alive())
+
+
+class Test_Concurrent_Container(unittest.TestCase):
+    def test_basic(self):
+        c = get_c()
+        c.set("a.b", 10)
+        self.assertEqual(c["a.b"], 10)
+        c.dset({"a.c": 20}, safe=True)
+        self.assertEqual(c.get("a.c"), 20)
+
+    def test_context(self):
+        c = get_c()
+        with c.context({"a.b": 10}):
+            self.assertEqual(c["a.b"], 10)
+            c.dset({"a.c": 20})
+            self.assertEqual(c["a.c"], 20)
+            self.assertEqual(dict.__getitem__(c, "a.c"), 2)
+            self.assertEqual(c.to_dict()["a.c"], 20)
+        self.assertEqual(c["a.b"], 1)
+        self.assertEqual(c["a.c"], 2)
+
+    def test_delete_in_context(self):
+        c = get_c()
+        with c.context({"a.b": 10}):
+            with self.assertRaises(RuntimeError):
+                del c["a.c"]
+            with self.assertRaises(RuntimeError):
+                c.pop("a.c")
+            with self.assertRaises(RuntimeError):
+                c.popitem()
+            with self.assertRaises(RuntimeError):
+                c.clear()
+        self.assertEqual(c.to_dict(), {"a.b": 1, "a.c": 2, "d.e": 3})
+        self.assertEqual(c.pop("a.c"), 2)
+        self.assertNotIn("a.c", c)
+
+    def test_context_missing(self):
+        c = get_c()
+        with self.assertRaises(KeyError):
+            with c.context({"z": 10}):
+                pass
+
+    def test_threads_private(self):
+        c = get_c()
+        barrier = threading.Barrier(4)
+
+        def sweep(i):
+            seen = []
+            with c.context({"a.b": i}):
+                barrier.wait()
+                for j in range(50):
+                    c.dset({"a.c": j})
+                    seen.append((c["a.b"], c["a.c"]))
+            return seen == [(i, j) for j in range(50)]
+
+        with ThreadPoolExecutor(4) as pool:
+            self.assertTrue(all(pool.map(sweep, range(4))))
+        self.assertEqual(c.to_dict(), {"a.b": 1, "a.c": 2, "d.e": 3})
+
+    def test_copy_pickle(self):
+        c = get_c()
+        c2 = pickle.loads(pickle.dumps(c.copy()))
+        with c2.context({"a.b": 10}):
+            self.assertEqual(c2["a.b"], 10)
+        self.assertEqual(c2["a.b"], 1)
+
+    def test_copies_have_own_overlays(self):
+        c = get_c()
+        c2 = c.copy()
+        with c.context({"a.b": 10}):
+            with c2.context({"a.b": 20}):
+                self.assertEqual(c["a.b"], 10)
+                self.assertEqual(c2["a.b"], 20)
+            self.assertEqual(c2["a.b"], 1)
+            self.assertEqual(c["a.b"], 10)
+        self.assertEqual(dict(threadsafe._overlays.get()), {})
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:31:44 2026
+
+@author: Reuben
+"""
+
+import unittest
+
+from vartrix.trie import Dotkey_Trie, segments
+
+
+class Test_Dotkey_Trie(unittest.TestCase):
+    def test_segments(self):
+        self.assertEqual(segments("a.b"), ["a", "b"])
+        self.assertEqual(segments("a."), ["a"])
+        self.assertEqual(segments(""), [])
+
+    def test_along(self):
+        t = Dotkey_Trie()
+        t.add("", 0)
+        t.add("a", 1)
+        t.add("a.b", 2)
+        t.add("a.c", 3)
+        self.assertEqual(sorted(t.along("a.b.c")), [0, 1, 2])
+
+    def test_discard_prunes(self):
+        t = Dotkey_Trie()
+        t.add("a.b.c", 1)
+        t.discard("a.b.c", 1)
+        self.assertFalse(t)
+        self.assertIsNone(t.find("a"))
+
+    def test_match_double_star(self):
+        t = Dotkey_Trie()
+        for key in ["a.x", "a.b.x", "a.b.c.x", "x", "a.b.y"]:
+            t.add(key, key)
+        expected = ["a.b.c.x", "a.b.x", "a.x", "x"]
+        self.assertEqual(sorted(t.match("**.x")), expected)
+        self.assertEqual(sorted(t.match("a.**.x")), expected[:3])
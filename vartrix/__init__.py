@@ -13,6 +13,14 @@ from . import context
 from . import container
 from . import automate
 from . import sequence
+from . import cache
+from . import results
+from . import reducers
+from . import threadsafe
+from . import shared
+from . import layered
+from . import progress
+from . import instrument
 from . import namespace
 
 
@@ -11,6 +11,8 @@ import pandas as pd
 
 class Aliases(dict):
     def translate(self, dct):
+        if self.keys().isdisjoint(dct.keys()):
+            return dict(dct)
         out = {}
         for k, v in dct.items():
             if k in self:
@@ -6,11 +6,20 @@ Created on Mon Aug 26 22:12:43 2019
 """
 
 import os
+import pickle
+from math import prod
+from time import perf_counter
+from multiprocessing import Manager
+from concurrent.futures import ProcessPoolExecutor, wait
+
 import pandas as pd
 
 from . import settings
 from .aliases import Aliases
 from . import persist
+from . import instrument
+from .sequence import Combinations
+from .progress import Progress_Reporter
 
 root = os.path.dirname(os.path.abspath(__file__))
 
@@ -29,6 +38,79 @@ def safe_call(method_name, obj, *args, **kwargs):
         pass
 
 
+def part_range(n, part=None):
+    """Return the range of indices for one part of n items
+
+    Args:
+        n (int): The number of items.
+        part (tuple): [Optional] A (w, n_parts) tuple for part w of n_parts
+            contiguous parts of similar size. Defaults to all items.
+    """
+    if part is None:
+        return range(n)
+    w, n_parts = part
+    return range(n * w // n_parts, n * (w + 1) // n_parts)
+
+
+def _run_part(
+    payload, automation_set, seq_name, aliases, part, progress, store
+):
+    container, obj = pickle.loads(payload)
+    try:
+        automation_set.run(
+            container,
+            obj,
+            seq_name,
+            aliases=aliases,
+            part=part,
+            progress=progress,
+            store=store,
+        )
+    finally:
+        if store is not None:
+            store.close()
+        if progress is not None:
+            progress.flush()
+    return obj
+
+
+class Plan:
+    """The number of iterations in an automation set
+
+    Args:
+        name (str): The name of the automation set.
+        counts (dict): The number of combinations for each
+            (sequence name, method name) tuple, in run order.
+    """
+
+    def __init__(self, name, counts):
+        self.name = name
+        self.counts = counts
+
+    @property
+    def total(self):
+        """The total number of iterations"""
+        return sum(self.counts.values())
+
+    def __len__(self):
+        return self.total
+
+    def sequences(self):
+        """Return a dictionary of the number of iterations per sequence"""
+        out = {}
+        for (seq_name, method_name), n in self.counts.items():
+            out[seq_name] = out.get(seq_name, 0) + n
+        return out
+
+    def __repr__(self):
+        lines = ['Plan for "' + self.name + '" set:']
+        for (seq_name, method_name), n in self.counts.items():
+            name = seq_name + "." + method_name + ": "
+            lines.append("   " + name.ljust(40) + str(n))
+        lines.append("   " + "total: ".ljust(40) + str(self.total))
+        return "\n".join(lines)
+
+
 class Vector:
     """Subclass for different entry formats"""
 
@@ -205,46 +287,107 @@ class Method:
         for vector_name in data:
             self.add(vectors[vector_name])
 
-    def get_lst(self, vectors=None, typ="values"):
+    def __len__(self):
+        return prod(vector.n for vector in self._vectors)
+
+    def combinations(self, vectors=None, typ="values"):
+        """Return a lazy sequence of the value or label dictionaries
+
+        Args:
+            vectors (list): [Optional] The vectors. Defaults to the vectors
+                of this method.
+            typ (str): 'values' or 'labels'.
+
+        Returns:
+            Combinations: The dictionaries, in the same order as `get_lst`.
+        """
         vectors = self._vectors if vectors is None else vectors
-        if len(vectors) > 1:
-            lst = self.get_lst(vectors=vectors[1:], typ=typ)
-        else:
-            lst = [{}]
-        vector = vectors[0]
-        out_lst = []
-        for value in vector.values(typ=typ):
-            for d in lst:
-                dct = value.copy()
-                dct.update(d)
-                out_lst.append(dct)
-        return out_lst
-
-    def execute(self, container, obj, aliases=None, info=None):
+        return Combinations([vector.values(typ=typ) for vector in vectors])
+
+    def stream(self, start=0, stop=None):
+        """Yield (values, labels) pairs for each combination
+
+        Args:
+            start (int): [Optional] The index of the first combination.
+            stop (int): [Optional] The index to stop before.
+        """
+        values = self.combinations(typ="values")[start:stop]
+        labels = self.combinations(typ="labels")[start:stop]
+        return zip(values, labels)
+
+    def get_lst(self, vectors=None, typ="values"):
+        """Return a list of the value or label dictionaries
+
+        Prefer `stream`, which doesn't build the full list.
+        """
+        return list(self.combinations(vectors=vectors, typ=typ))
+
+    def execute(self, container, obj, aliases=None, info=None, part=None):
         info = {} if info is None else info
         info["method"] = self._name
+        listeners = instrument.active()
+        indices = part_range(len(self), part)
+        if listeners is not None:
+            listeners.method_start(info, len(indices))
+            start = perf_counter()
         safe_call("prepare_method", obj, self._name)
+        if len(indices) > 0:
+            self._iterate(container, obj, aliases, info, indices, listeners)
+        safe_call("finish_method", obj, self._name)
+        if listeners is not None:
+            listeners.method_end(info, perf_counter() - start)
+
+    def _iterate(self, container, obj, aliases, info, indices, listeners):
         method = getattr(obj, self._name)
-        val_list = self.get_lst(typ="values")
-        label_lst = self.get_lst(typ="labels")
-        n = len(val_list)
+        n = len(indices)
+        first = self.combinations(typ="values")[indices.start]
         if aliases is not None:
-            val_list = [aliases.translate(d) for d in val_list]
-        with container.context(val_list[0]):
+            first = aliases.translate(first)
+        progress = info.get("progress")
+        store = info.get("store")
+        if store is not None:
+            names = (info["set"], info["sequence"], self._name)
+            done = store.completed(*names)
+        with container.context(first):
             i = 0
-            for val_dct, label_dct in zip(val_list, label_lst):
+            stream = self.stream(indices.start, indices.stop)
+            for val_dct, label_dct in stream:
                 i += 1
+                if store is not None and done:
+                    if store.label_key(label_dct) in done:
+                        if progress is not None:
+                            progress.skip()
+                        continue
+                if listeners is not None:
+                    listeners.iteration_start(info, i, label_dct)
+                    start = perf_counter()
+                if aliases is not None:
+                    val_dct = aliases.translate(val_dct)
                 container.dset(val_dct)
                 if settings.PRINT_UPDATES:
                     self.show(info, label_dct, i / n)
-                method(info["sequence"], val_dct, label_dct)
-        safe_call("finish_method", obj, self._name)
+                ret = method(info["sequence"], val_dct, label_dct)
+                if store is not None:
+                    store.add(*names, label_dct, val_dct, ret)
+                if listeners is not None:
+                    duration = perf_counter() - start
+                    listeners.iteration_end(info, i, label_dct, duration)
+                if progress is not None:
+                    progress.step()
 
     def show(self, info, label_dct, complete=None):
+        """Print the iteration details
+
+        Used when `settings.PRINT_UPDATES` is True. See
+        `instrument.Print_Listener` for the listener equivalent.
+        """
         if complete is not None:
             s = "{:0.2f}% ".format(complete * 100)
         else:
             s = ""
+        progress = info.get("progress")
+        if progress is not None and progress.eta is not None:
+            s += "(eta {:0.0f} s) ".format(progress.eta)
         print(
             s
             + 'Executing "'
@@ -293,13 +436,20 @@ class Sequence:
             method.build(meth_data, vectors)
             self.add(method)
 
-    def execute(self, container, obj, aliases=None, info=None):
+    def execute(self, container, obj, aliases=None, info=None, part=None):
         info = {} if info is None else info
         info["sequence"] = self._name
+        listeners = instrument.active()
+        if listeners is not None:
+            listeners.sequence_start(info)
+            start = perf_counter()
         safe_call("prepare_sequence", obj, self._name)
         for method in self._methods:
-            method.execute(container, obj, aliases, info=info)
+            method.execute(container, obj, aliases, info=info, part=part)
         safe_call("finish_sequence", obj, self._name)
+        if listeners is not None:
+            info.pop("method", None)
+            listeners.sequence_end(info, perf_counter() - start)
 
 
 class Automation_Set:
@@ -350,7 +500,36 @@ class Automation_Set:
             out[seq_name] = seq_dct
         return out
 
-    def run(self, container, obj, seq_name=None, aliases=None):
+    def _selected(self, seq_name=None):
+        for sequence in self._sequences:
+            if seq_name is None or sequence.name == seq_name:
+                yield sequence
+
+    def plan(self, seq_name=None, part=None):
+        """Return the Plan for a run, without running anything
+
+        Args:
+            seq_name (str): [Optional] A specific sequence within the set.
+            part (tuple): [Optional] A (w, n_parts) tuple, as for `run`.
+        """
+        counts = {}
+        for sequence in self._selected(seq_name):
+            for method in sequence._methods:
+                key = (sequence.name, method.name)
+                n = len(part_range(len(method), part))
+                counts[key] = counts.get(key, 0) + n
+        return Plan(self._name, counts)
+
+    def run(
+        self,
+        container,
+        obj,
+        seq_name=None,
+        aliases=None,
+        part=None,
+        progress=None,
+        store=None,
+    ):
         """Run an automation set
 
         Args:
@@ -358,16 +537,39 @@ class Automation_Set:
             obj (object): The automated class instance.
             seq_name (str): [Optional] A specific sequence within the set
                 to run exclusively.
+            part (tuple): [Optional] A (w, n_parts) tuple to run only part w
+                of each method's combinations.
+            progress (Progress): [Optional] A Progress instance that is
+                started with the planned total and stepped each iteration.
+                It is also available to `show` in the info dictionary.
+            store (results.Sqlite_Store): [Optional] A store for the return
+                values of the automated methods. Combinations that already
+                have a stored result are skipped, so an interrupted run can
+                be resumed.
         """
+        if progress is not None:
+            progress.start(self.plan(seq_name, part).total)
+        listeners = instrument.active()
+        if listeners is not None:
+            listeners.set_start({"set": self._name})
+            start = perf_counter()
         safe_call("prepare", obj)
-        for sequence in self._sequences:
-            if seq_name is not None:
-                if sequence.name is not seq_name:
-                    continue
+        for sequence in self._selected(seq_name):
+            info = {"set": self._name}
+            if progress is not None:
+                info["progress"] = progress
+            if store is not None:
+                info["store"] = store
             sequence.execute(
-                container, obj, aliases=aliases, info={"set": self._name}
+                container,
+                obj,
+                aliases=aliases,
+                info=info,
+                part=part,
             )
         safe_call("finish", obj)
+        if listeners is not None:
+            listeners.set_end({"set": self._name}, perf_counter() - start)
 
 
 class Automator:
@@ -401,11 +603,107 @@ class Automator:
             automation_set.build(set_data)
             self.set_automation_set(set_name, automation_set)
 
-    def run(self, set_name, obj, seq_name=None):
+    def plan(self, set_name, seq_name=None):
+        """Return the Plan for an automation set
+
+        Args:
+            set_name (str): The name of the set.
+            seq_name (str): [Optional] A specific sequence within the set.
+        """
+        return self._sets[set_name].plan(seq_name)
+
+    def run(
+        self,
+        set_name,
+        obj,
+        seq_name=None,
+        workers=None,
+        progress=None,
+        store=None,
+    ):
+        """Run an automation set
+
+        Args:
+            set_name (str): The name of the set to run
+            obj (object): The automated class instance.
+            seq_name (str): [Optional] A specific sequence within the set
+                to run exclusively.
+            workers (int): [Optional] The number of worker processes. Each
+                worker runs a contiguous part of every method's
+                combinations, on its own copy of the container and obj.
+            progress (Progress): [Optional] Tracks the iterations and the
+                estimated time remaining. Workers report their iterations
+                to it while they run.
+            store (results.Sqlite_Store): [Optional] A store for the return
+                values of the automated methods. Combinations that already
+                have a stored result are skipped.
+
+        Returns:
+            list: If workers is given, the obj copy from each worker, in
+            order. Otherwise None.
+
+        Note:
+            The container and obj are pickled together, so references from
+            obj to the container are kept in the workers. The prepare and
+            finish methods of obj are called once in each worker.
+        """
         automation_set = self._sets[set_name]
-        automation_set.run(
-            container=self.container,
-            obj=obj,
-            seq_name=seq_name,
-            aliases=self._aliases,
-        )
+        if workers is None:
+            automation_set.run(
+                container=self.container,
+                obj=obj,
+                seq_name=seq_name,
+                aliases=self._aliases,
+                progress=progress,
+                store=store,
+            )
+            return
+        if progress is None:
+            return self._run_workers(
+                automation_set, obj, seq_name, workers, store=store
+            )
+        with Manager() as manager:
+            queue = manager.Queue()
+            progress.start(automation_set.plan(seq_name).total)
+            return self._run_workers(
+                automation_set,
+                obj,
+                seq_name,
+                workers,
+                store=store,
+                progress=progress,
+                reporter=Progress_Reporter(queue),
+            )
+
+    def _run_workers(
+        self,
+        automation_set,
+        obj,
+        seq_name,
+        workers,
+        store=None,
+        progress=None,
+        reporter=None,
+    ):
+        payload = pickle.dumps((self.container, obj))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _run_part,
+                    payload,
+                    automation_set,
+                    seq_name,
+                    self._aliases,
+                    (w, workers),
+                    reporter,
+                    store,
+                )
+                for w in range(workers)
+            ]
+            if reporter is not None:
+                pending = set(futures)
+                while pending:
+                    done, pending = wait(pending, timeout=0.1)
+                    progress.receive(reporter.queue)
+                progress.receive(reporter.queue)
+            return [future.result() for future in futures]
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+@author: Reuben
+
+A cache of function return values for sequence iteration.
+
+Entries are keyed by the function identity and the fingerprint of the
+context the function is called with. Entries are kept in an in-memory LRU
+and, optionally, in a directory on disk so they survive between runs.
+
+"""
+
+from __future__ import annotations
+import os
+import pickle
+import hashlib
+import types
+import typing
+import threading
+from functools import partial
+from collections import OrderedDict
+
+from . import utils
+
+MISSING = object()
+
+
+def _feed_code(h, code: types.CodeType) -> None:
+    h.update(code.co_code)
+    h.update(" ".join(code.co_names).encode() + b";")
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            _feed_code(h, const)
+        elif isinstance(const, frozenset):
+            h.update(repr(sorted(const, key=repr)).encode())
+        else:
+            h.update(repr(const).encode() + b";")
+
+
+def _value_id(val) -> str:
+    if hasattr(val, "__code__") or isinstance(val, partial):
+        return function_id(val)
+    try:
+        return utils.stable_hash(val)
+    except Exception:
+        return type(val).__qualname__  # Not picklable
+
+
+def _state_id(obj) -> str:
+    try:
+        return utils.stable_hash(getattr(obj, "__dict__", obj))
+    except Exception as e:
+        raise TypeError(
+            "Cannot identify the state of " + type(obj).__qualname__ + "."
+        ) from e
+
+
+def function_id(func: typing.Callable) -> str:
+    """Return a string that identifies a function between sessions
+
+    The string includes the module, qualified name and a hash of the
+    bytecode, constants, global names, default arguments and closure
+    values, so editing the function invalidates cached values. The state of
+    the instance is included for bound methods and callable objects.
+
+    Raises:
+        TypeError: If the instance state can't be hashed.
+    """
+    if isinstance(func, partial):
+        return (
+            function_id(func.func)
+            + "|"
+            + utils.stable_hash([func.args, func.keywords])
+        )
+    if isinstance(func, types.MethodType):
+        return function_id(func.__func__) + "|" + _state_id(func.__self__)
+    if not hasattr(func, "__code__") and not isinstance(func, type):
+        call = getattr(type(func), "__call__", None)
+        if hasattr(call, "__code__"):
+            return function_id(call) + "|" + _state_id(func)
+    if not hasattr(func, "__qualname__"):
+        func = type(func)
+    name = str(getattr(func, "__module__", "")) + "." + func.__qualname__
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        h = hashlib.blake2b(digest_size=8)
+        _feed_code(h, code)
+        values = [func.__defaults__, func.__kwdefaults__]
+        for cell in func.__closure__ or ():
+            try:
+                values.append(cell.cell_contents)
+            except ValueError:
+                values.append(None)  # An empty cell
+        h.update(" ".join(_value_id(v) for v in values).encode())
+        name += "|" + h.hexdigest()
+    return name
+
+
+class Result_Cache:
+    """An LRU cache of function return values
+
+    Args:
+        maxsize (int): [Optional] The maximum number of entries kept in
+            memory.
+        directory (str): [Optional] A directory to also store entries in.
+        max_disk_bytes (int): [Optional] The maximum total size of the files
+            in the directory. The least recently used files are removed
+            first.
+
+    Note:
+        Process pool workers receive a copy of the cache without the
+        in-memory entries. Use a directory to share entries with them.
+    """
+
+    def __init__(self, maxsize=1024, directory=None, max_disk_bytes=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_memory"] = OrderedDict()
+        state["_lock"] = None
+        state["_disk_bytes"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def key(self, func_id: str, context) -> str:
+        """Return the key for a function id and context"""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(func_id.encode())
+        h.update(context.fingerprint.encode())
+        return h.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key: str, default=MISSING):
+        """Get a cached value, or the default if it isn't cached"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    val = pickle.load(f)
+            except (FileNotFoundError, EOFError, pickle.UnpicklingError):
+                pass
+            else:
+                os.utime(path)
+                self._remember(key, val)
+                self.hits += 1
+                return val
+        self.misses += 1
+        return default
+
+    def _remember(self, key: str, val) -> None:
+        with self._lock:
+            self._memory[key] = val
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+    def set(self, key: str, val) -> None:
+        """Store a value"""
+        self._remember(key, val)
+        if self.directory is None:
+            return
+        path = self._path(key)
+        tmp = path + "." + str(os.getpid()) + "." + str(threading.get_ident())
+        with open(tmp, "wb") as f:
+            pickle.dump(val, f)
+        os.replace(tmp, path)
+        if self.max_disk_bytes is not None:
+            self._evict_disk(os.path.getsize(path))
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pkl"):
+                yield entry
+
+    def _evict_disk(self, added: int) -> None:
+        with self._lock:
+            if self._disk_bytes is None:
+                sizes = [e.stat().st_size for e in self._entries()]
+                self._disk_bytes = sum(sizes)
+            else:
+                self._disk_bytes += added
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            stats = [(e.stat(), e.path) for e in self._entries()]
+            stats.sort(key=lambda t: t[0].st_mtime)
+            self._disk_bytes = sum(stat.st_size for stat, path in stats)
+            for stat, path in stats:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._disk_bytes -= stat.st_size
+
+    def clear(self) -> None:
+        """Remove all entries, including those on disk"""
+        with self._lock:
+            self._memory.clear()
+            self._disk_bytes = None
+        if self.directory is not None:
+            for entry in list(self._entries()):
+                os.remove(entry.path)
+
+    def wrap(self, func: typing.Callable) -> Cached_Function:
+        """Return a version of func that uses this cache"""
+        return Cached_Function(func, self)
+
+
+class Cached_Function:
+    """A callable that looks up return values in a Result_Cache
+
+    Args:
+        func (callable): A function that accepts a context and an update_dict.
+        cache (Result_Cache): The cache.
+
+    Note:
+        If `function_id` can't identify func, such as a callable object with
+        unpicklable state, calls aren't cached.
+    """
+
+    def __init__(self, func: typing.Callable, cache: Result_Cache):
+        self.func = func
+        self.cache = cache
+        try:
+            self.func_id = function_id(func)
+        except TypeError:
+            self.func_id = None  # Can't be identified, so don't cache
+
+    def __call__(self, context, update_dict):
+        if self.func_id is None:
+            return self.func(context, update_dict)
+        key = self.cache.key(self.func_id, context)
+        val = self.cache.get(key)
+        if val is MISSING:
+            val = self.func(context, update_dict)
+            self.cache.set(key, val)
+        return val
@@ -12,20 +12,70 @@ dot-format. For example, 'A.b' means that 'b' is a subkey of 'A'. All keys
 are stored in a simple flat dictionary format, but some extra methods
 allow the heirarchy to be used to simplify usage.
 
+A Dotkey_Trie index over the dotkey segments is built on the first subtree
+query and then kept up to date, so `keys_under`, `subtree` and `select`
+cost time in proportion to the number of keys they return.
+
+Changes made within `transaction` or `context` are recorded in an undo log
+that holds only the previous value of each changed key. Nested scopes are
+marks in the log, so committing one is O(1) and rolling one back restores
+only the keys it touched.
+
+The keys changed since the last `load` or backup update are tracked, so
+`reset` restores only those keys and removes only keys that were added.
+
+Copies share their values, backup and locks with the source container. The
+backup and locks are only copied when one side changes them. `snapshot` and
+`restore` save and return to a state without making a new container.
+
+Observers can subscribe to changes to a dotkey or to all dotkeys under a
+prefix. Changes made together, such as in `dset`, `load` or within a
+`batch`, are sent as a single notification.
+
 """
 
 from contextlib import contextmanager
 from warnings import warn
 
+import numpy as np
+
 from .aliases import Aliases
+from .observers import Observers
+from .trie import Dotkey_Trie
 from . import utils
 
+MISSING = object()
+
+
+class Snapshot:
+    """The values and locks of a Container at a point in time
+
+    The values are shared with the container, not copied.
+    """
+
+    def __init__(self, data, locks):
+        self.data = data
+        self.locks = locks
+
+
+def _restore(cls, dct, state):
+    new = cls.__new__(cls)
+    new._set_state(state)
+    dict.update(new, dct)
+    return new
+
 
 class Container(dict):
     """A dictionary-like class that updates observers
 
     Args:
         dct (dict): A dictionary (possibly nested) of key-value pairs to use.
+        native_arrays (bool): [Optional] If true, np.array values are stored
+            as they are instead of being converted to lists by `set` and
+            `dset`. They are converted to lists only when saved.
+        read_only_arrays (bool): [Optional] If true with native_arrays,
+            np.array values are stored as read-only views, including the
+            loaded values and the backup values that `reset` restores.
 
     Note:
         A `dotkey` is a dictionary key in the Container. It's called a dotkey
@@ -33,16 +83,197 @@ class Container(dict):
         heirarchy.
     """
 
-    def __init__(self, dct=None):
+    def __init__(self, dct=None, native_arrays=False, read_only_arrays=False):
+        self._native_arrays = native_arrays
+        self._read_only_arrays = read_only_arrays
         self._backup = {}
         self._aliases = Aliases()
         self._locks = set()
+        self._shared = set()
+        self._dirty = set()
+        self._observers = Observers()
+        self._index = None
+        self._log = []
+        self._marks = []
         if dct is not None:
             self.load(dct)
 
+    def _state(self):
+        state = self.__dict__.copy()
+        state["_observers"] = Observers()  # Subscriptions aren't copied
+        state["_index"] = None
+        state["_log"] = []
+        state["_marks"] = []
+        state["_shared"] = set()
+        state["_dirty"] = self._dirty.copy()
+        return state
+
+    def _set_state(self, state):
+        self.__dict__.update(state)
+
+    def __reduce__(self):
+        return (_restore, (type(self), dict.copy(self), self._state()))
+
+    def _unshare(self, name):
+        """Copy a shared attribute before it is changed"""
+        if name in self._shared:
+            setattr(self, name, getattr(self, name).copy())
+            self._shared.discard(name)
+
+    def _write(self, key, val):
+        if self._index is not None and key not in self:
+            self._index.add(key, key)
+        dict.__setitem__(self, key, val)
+
+    def _erase(self, key):
+        dict.__delitem__(self, key)
+        if self._index is not None:
+            self._index.discard(key, key)
+
+    def __setitem__(self, key, val):
+        if self._marks:
+            self._record(key)
+        self._write(key, val)
+        self._dirty.add(key)
+        self._observers.changed(self, (key,))
+
+    def __delitem__(self, key):
+        if self._marks:
+            self._record(key)
+        self._erase(key)
+        self._dirty.add(key)
+        self._observers.changed(self, (key,))
+
+    def update(self, *args, **kwargs):
+        d = dict(*args, **kwargs)
+        if self._marks:
+            for key in d.keys():
+                self._record(key)
+        if self._index is not None:
+            for key in d.keys() - self.keys():
+                self._index.add(key, key)
+        dict.update(self, d)
+        self._dirty.update(d.keys())
+        self._observers.changed(self, d.keys())
+
+    def clear(self):
+        if self._marks:
+            for key in self.keys():
+                self._record(key)
+        keys = list(self.keys()) if self._observers else ()
+        self._dirty.update(self.keys())
+        dict.clear(self)
+        if self._index is not None:
+            self._index.clear()
+        self._observers.changed(self, keys)
+
+    def pop(self, key, *default):
+        if key not in self:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        val = dict.__getitem__(self, key)
+        del self[key]
+        return val
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): container is empty")
+        key = next(reversed(self.keys()))
+        return key, self.pop(key)
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        self[key] = default
+        return default
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    @property
+    def index(self):
+        """The Dotkey_Trie index of dotkeys, built on first use"""
+        if self._index is None:
+            index = Dotkey_Trie()
+            for key in self.keys():
+                index.add(key, key)
+            self._index = index
+        return self._index
+
+    def keys_under(self, prefix):
+        """Return a list of the dotkeys under a prefix
+
+        Args:
+            prefix (str): A dotkey prefix such as 'A' or 'A.'. A dotkey equal
+                to the prefix is included.
+        """
+        return list(self.index.under(prefix))
+
+    def subtree(self, prefix):
+        """Return a dictionary of the dotkeys and values under a prefix"""
+        return {k: dict.__getitem__(self, k) for k in self.index.under(prefix)}
+
+    def select(self, pattern):
+        """Return a dictionary of the dotkeys and values matching a pattern
+
+        Args:
+            pattern (str): A glob pattern matched segment by segment, such
+                as '*.stiffness' or 'A.*.c'. A '**' segment matches any
+                number of segments, such as '**.stiffness'.
+        """
+        keys = self.index.match(pattern)
+        return {k: dict.__getitem__(self, k) for k in keys}
+
+    def subscribe(self, callback, key=None, prefix=None):
+        """Subscribe to changes in values
+
+        Args:
+            callback (func): A function that is called with the container
+                and a frozenset of the changed dotkeys.
+            key (str): [Optional] A dotkey to observe.
+            prefix (str): [Optional] A dotkey prefix, such as 'A.', to
+                observe all dotkeys under it.
+
+        Returns:
+            Subscription: The subscription, for use with `unsubscribe`.
+
+        Note:
+            Specify either key or prefix.
+        """
+        if key is not None:
+            key = self._aliases[key]
+        return self._observers.subscribe(callback, key=key, prefix=prefix)
+
+    def unsubscribe(self, subscription):
+        self._observers.unsubscribe(subscription)
+
+    @contextmanager
+    def batch(self):
+        """A context manager that groups notifications
+
+        Subscribers are notified once, when the outermost batch ends, with
+        all of the changed dotkeys.
+        """
+        self._observers.begin()
+        try:
+            yield self
+        finally:
+            self._observers.end(self)
+
     def set_aliases(self, aliases):
         self._aliases = Aliases(aliases)
 
+    def _convert(self, val):
+        if not self._native_arrays:
+            return utils.denumpify(val)
+        if self._read_only_arrays and isinstance(val, np.ndarray):
+            view = val.view()
+            view.flags.writeable = False
+            return view
+        return val
+
     def set(self, key, val, safe=False):
         """Set the value of a key
 
@@ -62,12 +293,15 @@ class Container(dict):
                     "Key '" + key + "' was locked while setting "
                     "in safe mode."
                 )
-        v = utils.denumpify(val)
+        v = self._convert(val)
         self[self._aliases[key]] = v  # Set the value
 
     def dset(self, dct, safe=False, update_backup=False):
         """Set multiple values specified in a dictionary
 
+        Aliases are resolved and keys are checked once for the whole
+        dictionary, then all values are written in one update.
+
         Args:
             dct (dict): The dictionary of key-value pairs.
             safe (bool): Optional boolean. If true, the key must already
@@ -76,84 +310,211 @@ class Container(dict):
                 that reset() restores.
         """
         d = self._aliases.translate(dct)
-        for key, val in d.items():
-            try:
-                self.set(key, val, safe=safe)
-            except KeyError as e:
-                if not safe:
-                    raise e
-                else:
-                    unmatched = [k for k in d.keys() if k not in self]
-                    raise KeyError(
-                        "Only values for existing keys are allowed. "
-                        + "The following keys are not valid: "
-                        + ", ".join(unmatched)
-                    )
+        if safe:
+            if not self.keys() >= d.keys():
+                unmatched = [k for k in d.keys() if k not in self]
+                raise KeyError(
+                    "Only values for existing keys are allowed. "
+                    + "The following keys are not valid: "
+                    + ", ".join(unmatched)
+                )
+            if not self._locks.isdisjoint(d.keys()):
+                key = next(k for k in d.keys() if k in self._locks)
+                raise ValueError(
+                    "Key '" + key + "' was locked while setting "
+                    "in safe mode."
+                )
+        vals = self._aliases.translate(d)
+        if not self._native_arrays or self._read_only_arrays:
+            for k, v in vals.items():
+                if isinstance(v, utils.DENUMPIFY_TYPES):
+                    vals[k] = self._convert(v)
+        self.update(vals)
         if update_backup:
-            self._backup.update(d)
+            self._unshare("_backup")
+            self._backup.update(vals)
+            self._dirty.difference_update(vals.keys())
 
     def lock(self, key):
+        self._unshare("_locks")
         self._locks.add(self._aliases[key])
 
     def unlock(self, key):
+        self._unshare("_locks")
         self._locks.remove(self._aliases[key])
 
     def load(self, dct):
         """Set the container data using a dictionary"""
-        self.clear()
-        self._backup.clear()
-        self._locks.clear()
-        self.add(dct)
+        if self._marks:
+            raise RuntimeError("Cannot load within a transaction or context.")
+        with self.batch():
+            self.clear()
+            self._backup = {}
+            self._locks = set()
+            self._shared.clear()
+            self.add(dct)
+        self._dirty.clear()
+
+    @property
+    def dirty(self):
+        """The keys changed since the last load or backup update"""
+        return frozenset(self._dirty)
 
     def reset(self):
-        self.load(self._backup.copy())
+        """Restore the backup values and clear locks
+
+        Only the keys changed since the last load or backup update are
+        restored, and keys that have been added are removed.
+        """
+        backup = self._backup
+        with self.batch():
+            for key in list(self._dirty):
+                if key in backup:
+                    self[key] = backup[key]
+                elif key in self:
+                    del self[key]
+        self._dirty.clear()
+        self._locks = set()
+        self._shared.discard("_locks")
 
     def add(self, dct):
         """Add another set of data to the container"""
         d = self._aliases.translate(dct)
+        if self._native_arrays and self._read_only_arrays:
+            for k, v in d.items():
+                if isinstance(v, np.ndarray):
+                    d[k] = self._convert(v)
         self.update(d)
+        self._unshare("_backup")
         self._backup.update(d)
+        self._dirty.difference_update(d.keys())
 
     @classmethod
     def merge(cls, containers):
-        """Combine a list of containers"""
+        """Combine a list of containers
+
+        Later containers override earlier ones. See
+        `layered.Layered_Container` to combine them without copying.
+        """
         c = cls()
         for container in containers:
             c.update(container)
         return c
 
+    def _record(self, key):
+        touched = self._marks[-1][1]
+        if key not in touched:
+            touched.add(key)
+            self._log.append((key, dict.get(self, key, MISSING)))
+
+    def _begin(self):
+        self._marks.append((len(self._log), set()))
+
+    def _commit(self):
+        self._marks.pop()
+        if not self._marks:
+            self._log.clear()
+
+    def _rollback(self, keys=None):
+        """Undo the changes since the last mark
+
+        Args:
+            keys (set): [Optional] Only undo changes to these keys. Other
+                changes are kept, as if committed.
+        """
+        mark, touched = self._marks.pop()
+        entries = self._log[mark:]
+        del self._log[mark:]
+        if keys is not None:
+            if self._marks:
+                self._log.extend(e for e in entries if e[0] not in keys)
+            entries = [e for e in entries if e[0] in keys]
+        for key, val in reversed(entries):
+            if val is MISSING:
+                if key in self:
+                    self._erase(key)
+            else:
+                self._write(key, val)
+        self._observers.changed(self, {key for key, val in entries})
+
+    @contextmanager
+    def transaction(self):
+        """A context manager that rolls back changes if an error is raised
+
+        Changes are kept if the block completes. Transactions can be nested,
+        in which case an error rolls back only the innermost transaction.
+        """
+        self._begin()
+        try:
+            yield self
+        except BaseException:
+            self._rollback()
+            raise
+        self._commit()
+
     @contextmanager
     def context(self, dct, safe=True):
         """A context manager for temporary changes in values
 
+        The values of the keys in dct are restored at the end, even if an
+        error is raised. Other changes made within the block are kept.
+
         Args:
             dct (dict): A dictionary of dotkey-value pairs.
             safe (bool): [Optional] set to false to ignore locks. Keys
                 must already exist in the container.
 
         """
+        for k in dct.keys():
+            if self._aliases[k] not in self:
+                raise KeyError(
+                    "Key '"
+                    + k
+                    + "' was missing. "
+                    + "Keys must already exist to use context."
+                )
+        self._begin()
         try:
-            originals = {k: self[k] for k in dct.keys()}
-        except KeyError:
-            for k in dct.keys():
-                if k not in self:
-                    raise KeyError(
-                        "Key '"
-                        + k
-                        + "' was missing. "
-                        + "Keys must already exist to use context."
-                    )
-        self.dset(dct, safe=safe)
-        yield self
-        self.dset(originals, safe=safe)
+            self.dset(dct, safe=safe)
+            yield self
+        finally:
+            self._rollback(keys=set(self._aliases.translate(dct)))
 
     def copy(self):
-        new = Container(dct=self)
-        new._backup = self._backup.copy()
-        new._locks = self._locks.copy()
-        new._aliases = self._aliases.copy()
+        """Return a copy that shares values with this container
+
+        The backup and locks are shared until either container changes them.
+        Subscriptions are not copied.
+        """
+        shared = {"_backup", "_locks"}
+        self._shared.update(shared)
+        new = _restore(type(self), self, self._state())
+        new._shared.update(shared)
         return new
 
+    def snapshot(self):
+        """Return a Snapshot of the current values and locks"""
+        return Snapshot(dict.copy(self), frozenset(self._locks))
+
+    def restore(self, snapshot):
+        """Return to the values and locks of a Snapshot
+
+        Only values that differ from the snapshot are written, and only keys
+        added since the snapshot are removed.
+        """
+        data = snapshot.data
+        with self.batch():
+            for key in self.keys() - data.keys():
+                del self[key]
+            changed = {
+                k: v
+                for k, v in data.items()
+                if dict.get(self, k, MISSING) is not v
+            }
+            self.update(changed)
+        self._locks = set(snapshot.locks)
+        self._shared.discard("_locks")
+
     def to_dict(self):
         return dict(self)
 
@@ -13,24 +13,146 @@ A Context is a dictionary-like object with some differences.
 These two differences ensure that the context is not accidentally changed then
 used.
 
+The `fingerprint` of a context is a digest of its contents. It is computed
+once, then contexts derived with with_value or with_values update it from
+only the changed keys.
+
+With `read_only=True`, mutable values are returned as read-only views instead
+of copies: non-writeable np.array views, MappingProxyType for dicts and
+Frozen_List for lists. Like the copies, the views are shallow.
+
+A Shared_Context behaves the same way, but derived contexts store only the
+changed values and a reference to the context they were derived from. This
+makes with_value and with_values cheap for large contexts.
+
 """
 
 from __future__ import annotations
 import typing
+from itertools import chain
+from types import MappingProxyType
+from collections.abc import KeysView, ItemsView, ValuesView, Sequence
+from functools import reduce
+from operator import xor
 import numpy as np
 from . import sequence
+from . import utils
+
+
+class Frozen_List(Sequence):
+    """A read-only view of a list"""
+
+    def __init__(self, lst: list):
+        self._lst = lst
+
+    def __getitem__(self, i):
+        return self._lst[i]
+
+    def __len__(self) -> int:
+        return len(self._lst)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Frozen_List):
+            other = other._lst
+        if isinstance(other, (list, tuple)):
+            return len(self._lst) == len(other) and all(
+                a == b for a, b in zip(self._lst, other)
+            )
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return "Frozen_List(" + repr(self._lst) + ")"
+
+
+def read_only(val: typing.Any) -> typing.Any:
+    """Return a read-only view of a list, dict, or np.array value"""
+    if isinstance(val, np.ndarray):
+        view = val.view()
+        view.flags.writeable = False
+        return view
+    if isinstance(val, dict):
+        return MappingProxyType(val)
+    if isinstance(val, list):
+        return Frozen_List(val)
+    return val
+
+
+def key_digest(key: str, value: typing.Any) -> int:
+    """Return an integer digest for a key-value pair"""
+    return int(utils.stable_hash((key, value)), 16)
 
 
 class Context(dict):
-    """A dictionary-like object used to store attributes"""
+    """A dictionary-like object used to store attributes
 
-    def __init__(self, *args, aliases=None, **kwargs):
+    Args:
+        aliases (dict): [Optional] A dictionary of alias-key pairs.
+        read_only (bool): [Optional] If true, mutable values are returned as
+            read-only views rather than copies.
+    """
+
+    def __init__(self, *args, aliases=None, read_only=False, **kwargs):
         self._aliases = aliases
+        self._read_only = read_only
+        self._fingerprint = None
+        self._digests = None
         dict.__init__(self, *args, **kwargs)
 
     def copy(self):
         d = dict.copy(self)
-        return Context(d, aliases=self._aliases)
+        new = Context(d, aliases=self._aliases, read_only=self._read_only)
+        self._pass_fingerprint(new, {})
+        return new
+
+    def __reduce__(self):
+        state = {
+            "_aliases": self._aliases,
+            "_read_only": self._read_only,
+            "_fingerprint": self._fingerprint,
+            "_digests": self._flat_digests(),
+        }
+        return (type(self), (self._flat(),), state)
+
+    def _flat(self) -> dict:
+        return dict.copy(self)
+
+    @property
+    def fingerprint(self) -> str:
+        """A hex digest of the keys and values in the context
+
+        The digest is the XOR of a digest for each key-value pair. It is
+        computed on first use and updated incrementally in derived contexts.
+        """
+        if self._fingerprint is None:
+            items = self._flat().items()
+            self._digests = {k: key_digest(k, v) for k, v in items}
+            self._fingerprint = reduce(xor, self._digests.values(), 0)
+        return format(self._fingerprint, "032x")
+
+    def _digest(self, key: str) -> int:
+        return self._digests[key]
+
+    def _flat_digests(self) -> dict:
+        return self._digests
+
+    def _child_digests(self, child: Context, digests: dict) -> dict:
+        d = self._digests.copy()
+        d.update(digests)
+        return d
+
+    def _pass_fingerprint(self, child: Context, dct: dict) -> None:
+        if self._fingerprint is None:
+            return
+        fingerprint = self._fingerprint
+        digests = {}
+        for key, val in dct.items():
+            if key in self:
+                fingerprint ^= self._digest(key)
+            digest = key_digest(key, val)
+            fingerprint ^= digest
+            digests[key] = digest
+        child._fingerprint = fingerprint
+        child._digests = self._child_digests(child, digests)
 
     def __setitem__(self, key: str, value: typing.Any) -> None:
         raise RuntimeError("Use the with_value method instead.")
@@ -49,7 +171,9 @@ class Context(dict):
             assert key in self, "Key not in container: " + str(key)
         d = dict.copy(self)
         d[key] = value
-        return Context(d, aliases=self._aliases)
+        new = Context(d, aliases=self._aliases, read_only=self._read_only)
+        self._pass_fingerprint(new, {key: value})
+        return new
 
     def with_values(self, dct: dict, safe: bool = True) -> Context:
         """Return a new Context instance with multiple changed values"""
@@ -58,27 +182,226 @@ class Context(dict):
                 assert key in self, "Key not in container: " + str(key)
         d = dict.copy(self)
         d.update(dct)
-        return Context(d, aliases=self._aliases)
+        new = Context(d, aliases=self._aliases, read_only=self._read_only)
+        self._pass_fingerprint(new, dct)
+        return new
+
+    def shared(self) -> Shared_Context:
+        """Return a Shared_Context with the same values"""
+        new = Shared_Context(
+            dict.copy(self), aliases=self._aliases, read_only=self._read_only
+        )
+        self._pass_fingerprint(new, {})
+        return new
 
     def get(self, key: str) -> typing.Any:
         """Get a value"""
         return self.__getitem__(key)
 
+    def _lookup(self, key: str) -> typing.Any:
+        return dict.__getitem__(self, key)
+
     def __getitem__(self, key: str) -> typing.Any:
         """Get a value"""
         try:
-            val = dict.__getitem__(self, key)
+            val = self._lookup(key)
         except KeyError:
             if self._aliases is None:
                 raise KeyError("Key not in Context: " + str(key))
             try:
-                val = dict.__getitem__(self, self._aliases[key])
+                val = self._lookup(self._aliases[key])
             except KeyError:
                 raise KeyError("Key not in Context or aliases: " + str(key))
         if isinstance(val, (list, dict, np.ndarray)):
+            if self._read_only:
+                return read_only(val)
             return val.copy()
         return val
 
-    def iterate(self, func: typing.Callable, update_dicts: list[dict]):
-        """Iterates over contexts updated with a list of dictionaries"""
-        return sequence.iterate(func, self, update_dicts)
+    def iterate(
+        self,
+        func: typing.Callable,
+        update_dicts: typing.Iterable[dict],
+        **kwargs,
+    ):
+        """Iterates over contexts updated with a list of dictionaries
+
+        Keyword arguments are passed to `sequence.iterate`.
+        """
+        return sequence.iterate(func, self, update_dicts, **kwargs)
+
+    def iterate_stream(
+        self,
+        func: typing.Callable,
+        update_dicts: typing.Iterable[dict],
+        **kwargs,
+    ):
+        """Yields (update_dict, return value) pairs as they are evaluated
+
+        Keyword arguments are passed to `sequence.iterate_stream`.
+        """
+        return sequence.iterate_stream(func, self, update_dicts, **kwargs)
+
+    def aiterate(
+        self,
+        func: typing.Callable,
+        update_dicts: typing.Iterable[dict],
+        concurrency: int = 8,
+    ):
+        """Asynchronously iterates over contexts with a coroutine function
+
+        Returns an asynchronous generator. See `sequence.aiterate`.
+        """
+        return sequence.aiterate(func, self, update_dicts, concurrency)
+
+    def iterate_batches(
+        self, func: typing.Callable, grid: dict, batch_size: int = None
+    ):
+        """Iterates over contexts updated with batches of grid rows"""
+        return sequence.iterate_batches(func, self, grid, batch_size)
+
+
+class Shared_Context(Context):
+    """A Context that shares unchanged values with its parent
+
+    Each derived context stores only its changed values and a reference to
+    the context it was derived from, so with_value and with_values cost
+    O(changed keys) instead of copying every value. Lookups walk the chain of
+    parents, which is flattened once it is deeper than `max_depth`.
+    """
+
+    max_depth = 8
+
+    def __init__(
+        self, *args, aliases=None, read_only=False, parent=None, **kwargs
+    ):
+        Context.__init__(
+            self, *args, aliases=aliases, read_only=read_only, **kwargs
+        )
+        self._parent = parent
+        if parent is None:
+            self._depth = 0
+            self._len = dict.__len__(self)
+        else:
+            self._depth = parent._depth + 1
+            new = [k for k in dict.__iter__(self) if k not in parent]
+            self._len = parent._len + len(new)
+
+    def _chain(self) -> list[Shared_Context]:
+        nodes = []
+        node = self
+        while node is not None:
+            nodes.append(node)
+            node = node._parent
+        return nodes
+
+    def _flat(self) -> dict:
+        if self._parent is None:
+            return dict.copy(self)
+        d = {}
+        for node in reversed(self._chain()):
+            d.update(dict.items(node))
+        return d
+
+    def copy(self):
+        return self.with_values({}, safe=False)
+
+    def shared(self) -> Shared_Context:
+        return self
+
+    def with_value(
+        self, key: str, value: typing.Any, safe: bool = True
+    ) -> Shared_Context:
+        """Return a new Context instance with a changed value"""
+        return self.with_values({key: value}, safe=safe)
+
+    def with_values(self, dct: dict, safe: bool = True) -> Shared_Context:
+        """Return a new Context instance with multiple changed values"""
+        if safe:
+            for key in dct.keys():
+                assert key in self, "Key not in container: " + str(key)
+        if self._depth >= self.max_depth:
+            d = self._flat()
+            d.update(dct)
+            new = Shared_Context(
+                d, aliases=self._aliases, read_only=self._read_only
+            )
+        else:
+            new = Shared_Context(
+                dct,
+                aliases=self._aliases,
+                read_only=self._read_only,
+                parent=self,
+            )
+        self._pass_fingerprint(new, dct)
+        return new
+
+    def _digest(self, key: str) -> int:
+        node = self
+        while node is not None:
+            if node._digests is not None and key in node._digests:
+                return node._digests[key]
+            node = node._parent
+        raise KeyError(key)
+
+    def _flat_digests(self) -> dict:
+        if self._fingerprint is None:
+            return None
+        d = {}
+        for node in reversed(self._chain()):
+            if node._digests is not None:
+                d.update(node._digests)
+        return d
+
+    def _child_digests(self, child: Context, digests: dict) -> dict:
+        if child._parent is self:
+            return digests
+        d = self._flat_digests()
+        d.update(digests)
+        return d
+
+    def _lookup(self, key: str) -> typing.Any:
+        node = self
+        while node is not None:
+            if dict.__contains__(node, key):
+                return dict.__getitem__(node, key)
+            node = node._parent
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        node = self
+        while node is not None:
+            if dict.__contains__(node, key):
+                return True
+            node = node._parent
+        return False
+
+    def __iter__(self):
+        if self._parent is None:
+            return dict.__iter__(self)
+        parent = self._parent
+        new = [k for k in dict.__iter__(self) if k not in parent]
+        return chain(iter(parent), new)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def keys(self):
+        return KeysView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Shared_Context):
+            other = other._flat()
+        return self._flat() == other
+
+    def __ne__(self, other: object) -> bool:
+        return not self.__eq__(other)
+
+    def __repr__(self) -> str:
+        return repr(self._flat())
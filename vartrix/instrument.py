@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:02:51 2026
+
+@author: Reuben
+
+Structured events for automation runs.
+
+Listeners receive events when automation sets, sequences, methods and
+iterations start and end. When no listeners are added, automation checks
+this once per method and doesn't time anything, so the cost is negligible.
+
+Each event receives the info dictionary with the 'set', 'sequence' and
+'method' names. The dictionary changes as the run goes on, so copy it to
+keep it.
+
+Note:
+    Listeners are per process. Worker processes started by
+    `Automator.run` have their own listeners.
+
+"""
+
+import math
+from contextlib import contextmanager
+
+
+class Listener:
+    """A base class for listeners, with methods that do nothing
+
+    Override the methods for the events of interest. Durations are in
+    seconds.
+    """
+
+    def set_start(self, info):
+        pass
+
+    def set_end(self, info, duration):
+        pass
+
+    def sequence_start(self, info):
+        pass
+
+    def sequence_end(self, info, duration):
+        pass
+
+    def method_start(self, info, n):
+        pass
+
+    def method_end(self, info, duration):
+        pass
+
+    def iteration_start(self, info, i, label_dct):
+        pass
+
+    def iteration_end(self, info, i, label_dct, duration):
+        pass
+
+
+class Listeners(Listener):
+    """A group of listeners that receives events as one listener"""
+
+    def __init__(self):
+        self._listeners = []
+
+    def __bool__(self):
+        return bool(self._listeners)
+
+    def __len__(self):
+        return len(self._listeners)
+
+    def add(self, listener):
+        self._listeners.append(listener)
+
+    def remove(self, listener):
+        self._listeners.remove(listener)
+
+    def set_start(self, info):
+        for listener in self._listeners:
+            listener.set_start(info)
+
+    def set_end(self, info, duration):
+        for listener in self._listeners:
+            listener.set_end(info, duration)
+
+    def sequence_start(self, info):
+        for listener in self._listeners:
+            listener.sequence_start(info)
+
+    def sequence_end(self, info, duration):
+        for listener in self._listeners:
+            listener.sequence_end(info, duration)
+
+    def method_start(self, info, n):
+        for listener in self._listeners:
+            listener.method_start(info, n)
+
+    def method_end(self, info, duration):
+        for listener in self._listeners:
+            listener.method_end(info, duration)
+
+    def iteration_start(self, info, i, label_dct):
+        for listener in self._listeners:
+            listener.iteration_start(info, i, label_dct)
+
+    def iteration_end(self, info, i, label_dct, duration):
+        for listener in self._listeners:
+            listener.iteration_end(info, i, label_dct, duration)
+
+
+_listeners = Listeners()
+
+
+def add_listener(listener):
+    """Add a listener for automation events"""
+    _listeners.add(listener)
+
+
+def remove_listener(listener):
+    """Remove a listener"""
+    _listeners.remove(listener)
+
+
+def active():
+    """Return the listeners, or None if there are no listeners"""
+    return _listeners if _listeners else None
+
+
+@contextmanager
+def listening(*listeners):
+    """A context manager that adds listeners for the duration of a block"""
+    for listener in listeners:
+        add_listener(listener)
+    try:
+        yield listeners[0] if len(listeners) == 1 else listeners
+    finally:
+        for listener in listeners:
+            remove_listener(listener)
+
+
+def bucket(duration):
+    """Return the log2 histogram bucket for a duration
+
+    Bucket b holds durations d with 2**(b-1) <= d < 2**b.
+    """
+    if duration <= 0:
+        return None
+    return math.frexp(duration)[1]
+
+
+class Timing:
+    """Timing statistics and a log2 histogram of durations"""
+
+    __slots__ = ("count", "total", "min", "max", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.histogram = {}
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        if duration < self.min:
+            self.min = duration
+        if duration > self.max:
+            self.max = duration
+        b = bucket(duration)
+        self.histogram[b] = self.histogram.get(b, 0) + 1
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.min if self.count else None,
+            "max": self.max if self.count else None,
+            "histogram": dict(sorted(self.histogram.items(), key=_order)),
+        }
+
+
+def _order(item):
+    return -math.inf if item[0] is None else item[0]
+
+
+class Timing_Collector(Listener):
+    """Collects iteration timings for each method
+
+    Timings are keyed by (set name, sequence name, method name).
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self._current = None
+
+    def method_start(self, info, n):
+        key = (info.get("set"), info.get("sequence"), info.get("method"))
+        timing = self.timings.get(key)
+        if timing is None:
+            timing = self.timings[key] = Timing()
+        self._current = timing
+
+    def iteration_end(self, info, i, label_dct, duration):
+        self._current.add(duration)
+
+    def summary(self):
+        """Return a dictionary of the timing statistics for each method"""
+        return {key: timing.to_dict() for key, timing in self.timings.items()}
+
+
+class Print_Listener(Listener):
+    """Prints each iteration, like `settings.PRINT_UPDATES`"""
+
+    def __init__(self):
+        self._n = None
+
+    def method_start(self, info, n):
+        self._n = n
+
+    def iteration_start(self, info, i, label_dct):
+        s = "{:0.2f}% ".format(i / self._n * 100) if self._n else ""
+        print(
+            s
+            + 'Executing "'
+            + info.get("method", "unnamed")
+            + '" method in "'
+            + info.get("sequence", "unnamed")
+            + '" sequence in "'
+            + info.get("set", "unnamed")
+            + '" set with:'
+        )
+        for vec_name, item_name in label_dct.items():
+            print("   " + (vec_name + ": ").ljust(25) + str(item_name))
@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:05:17 2026
+
+@author: Reuben
+
+A stack of Containers that behaves like a single Container.
+
+Lookups check each layer in turn, from the highest priority layer down, so
+defaults, site configuration and scenario overrides can be combined without
+copying any values. `flatten` returns a merged Container, which is cached
+until one of the layers changes.
+
+"""
+
+import weakref
+from collections.abc import MutableMapping
+
+from .container import Container
+
+
+def _weak_callback(method):
+    # The layers shouldn't keep the Layered_Container alive
+    ref = weakref.WeakMethod(method)
+
+    def callback(container, keys):
+        method = ref()
+        if method is not None:
+            method(container, keys)
+
+    return callback
+
+
+def _unsubscribe(layers, subs):
+    for layer, sub in zip(layers, subs):
+        layer.unsubscribe(sub)
+    del layers[:]
+    del subs[:]
+
+
+class Layered_Container(MutableMapping):
+    """An ordered stack of Containers
+
+    Args:
+        layers (list): The Containers (or dictionaries), from the lowest to
+            the highest priority. Later layers override earlier ones, as in
+            `Container.merge`.
+
+    Values are written to, and deleted from, the top layer only, as in
+    collections.ChainMap. Use `push_layer` and `pop_layer` to change the
+    layers.
+
+    Note:
+        The subscriptions to the layers are removed when the
+        Layered_Container is closed or garbage collected.
+    """
+
+    def __init__(self, layers=None):
+        self._layers = []
+        self._subs = []
+        self._flat = None
+        self._callback = _weak_callback(self._changed)
+        self._finalizer = None
+        for layer in layers or []:
+            self.push_layer(layer)
+
+    @property
+    def layers(self):
+        """The layers, from the lowest to the highest priority"""
+        return tuple(self._layers)
+
+    @property
+    def top(self):
+        """The highest priority layer"""
+        return self._layers[-1]
+
+    def __reduce__(self):
+        return (type(self), (self._layers,))
+
+    def _changed(self, container, keys):
+        self._flat = None
+
+    def push_layer(self, layer):
+        """Add a layer with the highest priority
+
+        Args:
+            layer (Container): The layer. Dictionaries are converted to
+                Containers.
+
+        Returns:
+            Container: The layer.
+        """
+        if not isinstance(layer, Container):
+            layer = Container(layer)
+        if self._finalizer is None or not self._finalizer.alive:
+            self._finalizer = weakref.finalize(
+                self, _unsubscribe, self._layers, self._subs
+            )
+        self._subs.append(layer.subscribe(self._callback, prefix=""))
+        self._layers.append(layer)
+        self._flat = None
+        return layer
+
+    def pop_layer(self):
+        """Remove and return the highest priority layer"""
+        layer = self._layers.pop()
+        layer.unsubscribe(self._subs.pop())
+        self._flat = None
+        return layer
+
+    def close(self):
+        """Unsubscribe from, and remove, all layers"""
+        if self._finalizer is not None:
+            self._finalizer()
+        self._flat = None
+
+    def flatten(self):
+        """Return a Container with the merged values of all layers
+
+        The merged values are cached until a layer changes, so repeated calls
+        are cheap. The returned Container is a copy that shares values with
+        the cache.
+        """
+        if self._flat is None:
+            self._flat = Container.merge(self._layers)
+        return self._flat.copy()
+
+    def __getitem__(self, key):
+        if self._flat is not None:
+            return self._flat[key]
+        for layer in reversed(self._layers):
+            if key in layer:
+                return layer[key]
+        raise KeyError("Key error: " + str(key))
+
+    def __contains__(self, key):
+        if self._flat is not None:
+            return key in self._flat
+        return any(key in layer for layer in self._layers)
+
+    def __setitem__(self, key, val):
+        self.top[key] = val
+
+    def __delitem__(self, key):
+        del self.top[key]
+
+    def pop(self, key, *default):
+        """Remove a key from the top layer and return its value"""
+        return self.top.pop(key, *default)
+
+    def popitem(self):
+        """Remove and return an item from the top layer"""
+        return self.top.popitem()
+
+    def clear(self):
+        """Remove all values from the top layer"""
+        self.top.clear()
+
+    def __iter__(self):
+        if self._flat is not None:
+            return iter(self._flat)
+        keys = {}
+        for layer in self._layers:
+            keys.update(dict.fromkeys(layer))
+        return iter(keys)
+
+    def __len__(self):
+        if self._flat is not None:
+            return len(self._flat)
+        return len(set().union(*self._layers))
+
+    def layer_of(self, key):
+        """Return the highest priority layer that contains a key"""
+        for layer in reversed(self._layers):
+            if key in layer:
+                return layer
+        raise KeyError("Key error: " + str(key))
+
+    def to_dict(self):
+        return dict(self.flatten())
+
+    def __repr__(self):
+        return type(self).__name__ + "(" + repr(self._layers) + ")"
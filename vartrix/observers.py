@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:58:03 2026
+
+@author: Reuben
+
+Subscriptions to changes in a Container.
+
+A subscription is either for an exact dotkey or for a dotkey prefix such as
+'A.'. Prefix subscriptions are held in a Dotkey_Trie, so finding the
+subscribers for a changed dotkey costs O(key depth). Changes made inside a
+batch are sent as one notification per subscriber when the batch ends.
+
+"""
+
+from .trie import Dotkey_Trie
+
+
+class Subscription:
+    """A callback for changes to a dotkey or dotkey prefix
+
+    The callback is called with the container and a frozenset of the changed
+    dotkeys that match the subscription.
+    """
+
+    def __init__(self, callback, key=None, prefix=None):
+        self.callback = callback
+        self.key = key
+        self.prefix = prefix
+
+
+class Observers:
+    """The subscriptions for a Container"""
+
+    def __init__(self):
+        self._exact = {}
+        self._prefixes = Dotkey_Trie()
+        self._n = 0
+        self._depth = 0
+        self._pending = set()
+
+    def __bool__(self):
+        return self._n > 0
+
+    def subscribe(self, callback, key=None, prefix=None):
+        if (key is None) == (prefix is None):
+            raise ValueError("Specify exactly one of key or prefix.")
+        sub = Subscription(callback, key=key, prefix=prefix)
+        if key is not None:
+            self._exact.setdefault(key, set()).add(sub)
+        else:
+            self._prefixes.add(prefix, sub)
+        self._n += 1
+        return sub
+
+    def unsubscribe(self, sub):
+        if sub.key is not None:
+            subs = self._exact.get(sub.key, set())
+            if sub not in subs:
+                raise KeyError("Subscription not found.")
+            subs.discard(sub)
+            if not subs:
+                del self._exact[sub.key]
+        else:
+            self._prefixes.discard(sub.prefix, sub)
+        self._n -= 1
+
+    def begin(self):
+        self._depth += 1
+
+    def end(self, container):
+        self._depth -= 1
+        if self._depth == 0 and self._pending:
+            keys = self._pending
+            self._pending = set()
+            self._dispatch(container, keys)
+
+    def changed(self, container, keys):
+        """Notify subscribers of changed keys, or hold them during a batch"""
+        if not self._n:
+            return
+        if self._depth:
+            self._pending.update(keys)
+        else:
+            self._dispatch(container, keys)
+
+    def _dispatch(self, container, keys):
+        matched = {}
+        for key in keys:
+            for sub in self._exact.get(key, ()):
+                matched.setdefault(sub, set()).add(key)
+            for sub in self._prefixes.along(key):
+                matched.setdefault(sub, set()).add(key)
+        for sub, sub_keys in matched.items():
+            sub.callback(container, frozenset(sub_keys))
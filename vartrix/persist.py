@@ -94,7 +94,7 @@ class Yaml(Handler):
         with open(fname, mode="w") as f:
             y = yml.YAML()
             y.default_flow_style = flow_style
-            y.dump(dict(dct), f)
+            y.dump(utils.denumpify(dict(dct)), f)
 
 
 class Xlsx(Handler):
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:14:36 2026
+
+@author: Reuben
+
+Progress tracking for long runs.
+
+The rate is measured from the completed iterations, so the estimated time
+remaining improves as the run goes on. Worker processes send their progress
+to a Progress instance in the parent process with a Progress_Reporter.
+
+"""
+
+import time
+from queue import Empty
+
+
+class Progress:
+    """Tracks completed iterations, the rate and the time remaining
+
+    Args:
+        total (int): [Optional] The total number of iterations. It can also
+            be set by `start`.
+        callback (func): [Optional] A function that is called with this
+            Progress instance as iterations complete.
+        interval (float): The minimum number of seconds between callbacks.
+            The callback is always called when the last iteration completes.
+    """
+
+    def __init__(self, total=None, callback=None, interval=1.0):
+        self.total = total
+        self.callback = callback
+        self.interval = interval
+        self.done = 0
+        self._start = None
+        self._last = None
+
+    def start(self, total=None):
+        """Start timing, optionally setting the total"""
+        if total is not None:
+            self.total = total
+        self.done = 0
+        self._start = time.perf_counter()
+        self._last = self._start
+
+    def step(self, n=1):
+        """Record n completed iterations"""
+        if self._start is None:
+            self.start()
+        self.done += n
+        if self.callback is None:
+            return
+        now = time.perf_counter()
+        if now - self._last >= self.interval or self.done == self.total:
+            self._last = now
+            self.callback(self)
+
+    def skip(self, n=1):
+        """Remove n iterations from the total, such as ones already done
+
+        Skipped iterations don't count towards the rate.
+        """
+        if self.total is not None:
+            self.total -= n
+
+    def receive(self, queue):
+        """Apply the steps and skips sent by Progress_Reporters"""
+        while True:
+            try:
+                steps, skips = queue.get_nowait()
+            except Empty:
+                return
+            self.skip(skips)
+            self.step(steps)
+
+    @property
+    def elapsed(self):
+        """The number of seconds since the start"""
+        if self._start is None:
+            return 0.0
+        return time.perf_counter() - self._start
+
+    @property
+    def fraction(self):
+        """The fraction of iterations completed, or None if there's no total"""
+        if not self.total:
+            return None
+        return self.done / self.total
+
+    @property
+    def rate(self):
+        """The number of iterations per second"""
+        elapsed = self.elapsed
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self):
+        """The estimated number of seconds remaining, or None if unknown"""
+        rate = self.rate
+        if self.total is None or rate == 0:
+            return None
+        return (self.total - self.done) / rate
+
+    def __repr__(self):
+        s = "Progress(" + str(self.done) + "/" + str(self.total)
+        eta = self.eta
+        if eta is not None:
+            s += ", eta={:0.1f}s".format(eta)
+        return s + ")"
+
+
+class Progress_Reporter:
+    """Sends the progress of a worker process to a queue
+
+    The parent process passes the queue to `Progress.receive`. Steps and
+    skips are sent at most every `interval` seconds, and by `flush`.
+
+    Args:
+        queue (Queue): A queue that can be shared with worker processes,
+            such as one from a multiprocessing.Manager.
+        interval (float): The minimum number of seconds between sends.
+    """
+
+    eta = None
+
+    def __init__(self, queue, interval=0.1):
+        self.queue = queue
+        self.interval = interval
+        self._steps = 0
+        self._skips = 0
+        self._last = time.perf_counter()
+
+    def start(self, total=None):
+        pass
+
+    def step(self, n=1):
+        self._steps += n
+        if time.perf_counter() - self._last >= self.interval:
+            self.flush()
+
+    def skip(self, n=1):
+        self._skips += n
+
+    def flush(self):
+        """Send any steps and skips that haven't been sent"""
+        if self._steps or self._skips:
+            self.queue.put((self._steps, self._skips))
+            self._steps = 0
+            self._skips = 0
+        self._last = time.perf_counter()
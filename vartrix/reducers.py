@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:22:47 2026
+
+@author: Reuben
+
+Associative reducers that fold iteration results as they arrive.
+
+A reducer keeps an accumulator. `step` folds one result into it, and
+`combine` merges two accumulators. Because `combine` is associative,
+accumulators from different workers can be merged in a tree.
+
+>>> sequence.iterate(func, context, update_dicts, reduce=reducers.Mean())
+
+"""
+
+
+class Reducer:
+    """Base class for reducers
+
+    Args:
+        key (callable): [Optional] A function applied to each result before
+            it is reduced.
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+
+    def initial(self):
+        """Return an empty accumulator"""
+        return None
+
+    def value(self, result):
+        return result if self.key is None else self.key(result)
+
+    def step(self, acc, update_dict, result):
+        """Return the accumulator with a result folded in"""
+        return self.combine(acc, self.single(update_dict, self.value(result)))
+
+    def single(self, update_dict, value):
+        """Return the accumulator for a single value"""
+        return value
+
+    def combine(self, a, b):
+        """Return the combination of two accumulators"""
+        raise NotImplementedError
+
+    def finish(self, acc):
+        """Return the final result from an accumulator"""
+        return acc
+
+
+class Min(Reducer):
+    def combine(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return b if b < a else a
+
+
+class Max(Reducer):
+    def combine(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return b if b > a else a
+
+
+class Sum(Reducer):
+    def initial(self):
+        return 0
+
+    def combine(self, a, b):
+        return a + b
+
+
+class Count(Reducer):
+    def initial(self):
+        return 0
+
+    def single(self, update_dict, value):
+        return 1
+
+    def combine(self, a, b):
+        return a + b
+
+
+class Mean(Reducer):
+    def initial(self):
+        return (0, 0)
+
+    def single(self, update_dict, value):
+        return (value, 1)
+
+    def combine(self, a, b):
+        return (a[0] + b[0], a[1] + b[1])
+
+    def finish(self, acc):
+        total, n = acc
+        return total / n if n else None
+
+
+class Argmin(Reducer):
+    """Find the smallest value and its update_dict
+
+    The result is a (value, update_dict) tuple. Ties go to the earliest,
+    except with `iterate(..., ordered=False)`, where chunks are combined in
+    the order they complete and any of the tied values may be returned.
+    """
+
+    def single(self, update_dict, value):
+        return (value, update_dict)
+
+    def combine(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return b if b[0] < a[0] else a
+
+
+class Argmax(Argmin):
+    """Find the largest value and its update_dict
+
+    The result is a (value, update_dict) tuple. Ties go to the earliest,
+    except with `iterate(..., ordered=False)`, where chunks are combined in
+    the order they complete and any of the tied values may be returned.
+    """
+
+    def combine(self, a, b):
+        if a is None:
+            return b
+        if b is None:
+            return a
+        return b if b[0] > a[0] else a
+
+
+class Tree:
+    """Combine a stream of accumulators pairwise in a balanced tree
+
+    Only O(log n) accumulators are held at once.
+    """
+
+    def __init__(self, reducer):
+        self.reducer = reducer
+        self._stack = []
+
+    def push(self, acc):
+        level = 0
+        while self._stack and self._stack[-1][0] == level:
+            prev_level, prev = self._stack.pop()
+            acc = self.reducer.combine(prev, acc)
+            level += 1
+        self._stack.append((level, acc))
+
+    def result(self):
+        acc = self.reducer.initial()
+        for level, a in self._stack:
+            acc = self.reducer.combine(acc, a)
+        return acc
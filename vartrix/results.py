@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:05:21 2026
+
+@author: Reuben
+
+Sinks that write iteration results to disk in chunks.
+
+A sink buffers (update_dict, result) pairs and writes them out every
+`chunk_size` results, so only a bounded number of results is held in memory.
+Each chunk is written completely before the next is started, so results
+written before a crash can be read back with the sink's `read` method.
+
+Sqlite_Store records the return values of automated methods, so an
+interrupted `Automator.run` can resume where it stopped.
+
+"""
+
+import os
+import glob
+import json
+import pickle
+import sqlite3
+
+import numpy as np
+
+from .persist import is_importable
+
+IS_PANDAS = is_importable("pandas")
+if IS_PANDAS:
+    import pandas as pd
+
+
+def _to_json(obj):
+    if isinstance(obj, (np.ndarray, np.generic)):
+        return obj.tolist()
+    raise TypeError("Object of type " + type(obj).__name__ + " is not JSON")
+
+
+class Sink:
+    """Base class for result sinks
+
+    Args:
+        path (str): The file name or prefix to write to.
+        chunk_size (int): [Optional] The number of results to buffer before
+            writing them.
+    """
+
+    def __init__(self, path, chunk_size=1000):
+        self.path = path
+        self.chunk_size = chunk_size
+        self._buffer = []
+        self._n_chunks = 0
+
+    def write(self, update_dict, result):
+        """Add a result, writing the buffer if it is full"""
+        self._buffer.append((update_dict, result))
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write any buffered results"""
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self._n_chunks += 1
+            self._buffer = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _write_chunk(self, chunk):
+        raise NotImplementedError
+
+    @classmethod
+    def read(cls, path):
+        """Yield (update_dict, result) pairs that were written to disk"""
+        raise NotImplementedError
+
+
+class Jsonl_Sink(Sink):
+    """Write results as JSON lines to a single file
+
+    Each line is an object with 'update_dict' and 'result' entries. NumPy
+    arrays are written as lists.
+    """
+
+    def _write_chunk(self, chunk):
+        lines = []
+        for update_dict, result in chunk:
+            record = {"update_dict": update_dict, "result": result}
+            lines.append(json.dumps(record, default=_to_json) + "\n")
+        with open(self.path, mode="a") as f:
+            f.write("".join(lines))
+            f.flush()
+            os.fsync(f.fileno())
+
+    @classmethod
+    def read(cls, path):
+        with open(path, mode="r") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    return  # A partly written final line
+                yield record["update_dict"], record["result"]
+
+
+class _Chunk_Files(Sink):
+    """Write each chunk to its own numbered file"""
+
+    _suffix = None
+
+    def _fname(self, i):
+        return self.path + "_" + str(i).zfill(5) + "." + self._suffix
+
+    def _next_fname(self):
+        i = self._n_chunks
+        while os.path.exists(self._fname(i)):
+            i += 1
+        self._n_chunks = i
+        return self._fname(i)
+
+    def _write_chunk(self, chunk):
+        fname = self._next_fname()
+        tmp = fname + ".tmp"
+        with open(tmp, mode="wb") as f:
+            self._save(f, chunk)
+        os.replace(tmp, fname)
+
+    @classmethod
+    def _fnames(cls, path):
+        pattern = glob.escape(path) + "_" + "[0-9]" * 5 + "." + cls._suffix
+        return sorted(glob.glob(pattern))
+
+    @classmethod
+    def read(cls, path):
+        for fname in cls._fnames(path):
+            yield from cls._load(fname)
+
+
+class Npz_Sink(_Chunk_Files):
+    """Write results to numbered .npz files
+
+    The update_dict values are stored as one array per key and the results
+    as a single array, so results should be numbers or arrays of the same
+    shape.
+    """
+
+    _suffix = "npz"
+
+    def _save(self, f, chunk):
+        update_dicts = [update_dict for update_dict, result in chunk]
+        arrays = {
+            "update_dict." + k: np.array([d[k] for d in update_dicts])
+            for k in update_dicts[0]
+        }
+        arrays["result"] = np.array([result for update_dict, result in chunk])
+        np.savez(f, **arrays)
+
+    @classmethod
+    def _load(cls, fname):
+        with np.load(fname) as data:
+            n = len(data["result"])
+            keys = [k for k in data.files if k.startswith("update_dict.")]
+            columns = {k[len("update_dict.") :]: data[k] for k in keys}
+            results = data["result"]
+            for i in range(n):
+                update_dict = {k: v[i].tolist() for k, v in columns.items()}
+                yield update_dict, results[i]
+
+
+class Parquet_Sink(_Chunk_Files):
+    """Write results to numbered .parquet files
+
+    Requires pandas and a parquet engine such as pyarrow. Results that are
+    dictionaries are written as one column per key.
+    """
+
+    _suffix = "parquet"
+    _import_name = "pyarrow"
+
+    def __init__(self, path, chunk_size=1000):
+        if not IS_PANDAS or not is_importable(self._import_name):
+            raise ImportError(
+                "Packages 'pandas' and '"
+                + self._import_name
+                + "' are required for class "
+                + str(type(self))
+            )
+        super().__init__(path, chunk_size=chunk_size)
+
+    def _save(self, f, chunk):
+        rows = []
+        for update_dict, result in chunk:
+            row = {"update_dict." + k: v for k, v in update_dict.items()}
+            if isinstance(result, dict):
+                row.update({"result." + k: v for k, v in result.items()})
+            else:
+                row["result"] = result
+            rows.append(row)
+        pd.DataFrame(rows).to_parquet(f)
+
+    @classmethod
+    def _load(cls, fname):
+        df = pd.read_parquet(fname)
+        for row in df.to_dict(orient="records"):
+            update_dict = {}
+            result = {}
+            for k, v in row.items():
+                if k.startswith("update_dict."):
+                    update_dict[k[len("update_dict.") :]] = v
+                elif k == "result":
+                    result = v
+                else:
+                    result[k[len("result.") :]] = v
+            yield update_dict, result
+
+
+def _label_key(label_dct):
+    return json.dumps(label_dct, sort_keys=True, default=_to_json)
+
+
+def _param_value(val):
+    if isinstance(val, np.generic):
+        val = val.item()
+    if val is None or isinstance(val, (bool, int, float, str)):
+        return val
+    return json.dumps(val, sort_keys=True, default=_to_json)
+
+
+class Sqlite_Store:
+    """An SQLite database of automated method return values
+
+    Each completed iteration is stored with its set, sequence and method
+    names, its label dictionary and its pickled return value. The values
+    that were set in the container are stored in an indexed table, so
+    results can be queried by parameter value.
+
+    Args:
+        path (str): The database file name.
+        timeout (float): [Optional] The number of seconds to wait for
+            another connection's write to finish.
+
+    Note:
+        Each result is committed in its own short transaction, so process
+        pool workers can write to the same database without holding the
+        write lock between iterations. Only the path and timeout are
+        pickled, so workers open their own connections.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS results (
+            id INTEGER PRIMARY KEY,
+            set_name TEXT NOT NULL,
+            sequence TEXT NOT NULL,
+            method TEXT NOT NULL,
+            labels TEXT NOT NULL,
+            value BLOB,
+            UNIQUE (set_name, sequence, method, labels)
+        );
+        CREATE TABLE IF NOT EXISTS params (
+            result_id INTEGER NOT NULL REFERENCES results (id),
+            name TEXT NOT NULL,
+            value
+        );
+        CREATE INDEX IF NOT EXISTS params_name_value
+            ON params (name, value);
+        CREATE INDEX IF NOT EXISTS params_result ON params (result_id);
+    """
+
+    def __init__(self, path, timeout=60):
+        self.path = path
+        self.timeout = timeout
+        self._conn = None
+
+    def __getstate__(self):
+        return {"path": self.path, "timeout": self.timeout}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @property
+    def conn(self):
+        """The database connection, opened on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._schema)
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def label_key(label_dct):
+        """Return the key for a label dictionary"""
+        return _label_key(label_dct)
+
+    def completed(self, set_name, sequence, method):
+        """Return a set of the label keys of the stored results for a method"""
+        rows = self.conn.execute(
+            "SELECT labels FROM results "
+            "WHERE set_name = ? AND sequence = ? AND method = ?",
+            (set_name, sequence, method),
+        )
+        return {labels for (labels,) in rows}
+
+    def add(self, set_name, sequence, method, label_dct, val_dct, value):
+        """Add the result of an iteration, replacing any existing result"""
+        labels = _label_key(label_dct)
+        rows = [(k, _param_value(v)) for k, v in val_dct.items()]
+        blob = pickle.dumps(value)
+        conn = self.conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._add(conn, (set_name, sequence, method, labels), blob, rows)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _add(self, conn, key, blob, rows):
+        old = conn.execute(
+            "SELECT id FROM results WHERE set_name = ? AND sequence = ? "
+            "AND method = ? AND labels = ?",
+            key,
+        ).fetchone()
+        if old is not None:
+            conn.execute("DELETE FROM params WHERE result_id = ?", old)
+            conn.execute("DELETE FROM results WHERE id = ?", old)
+        cur = conn.execute(
+            "INSERT INTO results (set_name, sequence, method, labels, value) "
+            "VALUES (?, ?, ?, ?, ?)",
+            key + (blob,),
+        )
+        conn.executemany(
+            "INSERT INTO params (result_id, name, value) VALUES (?, ?, ?)",
+            [(cur.lastrowid, k, v) for k, v in rows],
+        )
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def query(self, set_name=None, sequence=None, method=None, params=None):
+        """Yield (label_dct, value) pairs for matching results
+
+        Results are read from the database as they are iterated.
+
+        Args:
+            set_name (str): [Optional] The automation set name.
+            sequence (str): [Optional] The sequence name.
+            method (str): [Optional] The method name.
+            params (dict): [Optional] Container dotkeys and the values they
+                were set to.
+        """
+        sql = "SELECT labels, value FROM results"
+        where = []
+        args = []
+        for col, val in (
+            ("set_name", set_name),
+            ("sequence", sequence),
+            ("method", method),
+        ):
+            if val is not None:
+                where.append(col + " = ?")
+                args.append(val)
+        for k, v in (params or {}).items():
+            where.append(
+                "id IN (SELECT result_id FROM params "
+                "WHERE name = ? AND value = ?)"
+            )
+            args.extend([k, _param_value(v)])
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        for labels, value in self.conn.execute(sql + " ORDER BY id", args):
+            yield json.loads(labels), pickle.loads(value)
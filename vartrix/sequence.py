@@ -10,8 +10,26 @@ Function to generate and run through sequences of parameters.
 
 from __future__ import annotations
 import typing
-from itertools import product
+import asyncio
+from math import prod
+from functools import partial
+from itertools import product, islice
+from collections import deque
+from collections.abc import Sequence
+import numpy as np
+from concurrent.futures import (
+    Executor,
+    ThreadPoolExecutor,
+    ProcessPoolExecutor,
+    wait,
+    FIRST_COMPLETED,
+)
 from . import context
+from .cache import Result_Cache
+from .results import Sink
+from .reducers import Reducer, Tree
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
 
 
 def make_label(update_dict, abbr=None) -> str:
@@ -111,16 +129,504 @@ def combinations(dicts: list[dict]) -> list[dict]:
     dlists = [dlist(dct) for dct in dicts]
     return combinations_from_lists(dlists)
 
-def iterate(
-    func: typing.Callable, context: context.Context, update_dicts: list[dict]
+
+def grid(dicts: list[dict], structured: bool = False) -> dict:
+    """Columnar equivalent of `combinations`
+
+    Instead of a list of update_dicts, return one np.array per key with an
+    element for each combination, in the same order as `combinations`.
+
+    Args:
+        dicts (list[dict]): A list of dictionaries, as for `combinations`.
+        structured (bool): [Optional] If true, return a structured np.array
+            with a field per key instead of a dictionary of arrays.
+
+    Raises:
+        ValueError: If any of the dictionaries is empty.
+
+    >>> dicts = [{'a': [4, 5]}, {'b': [2, 3], 'c': [6, 7]}]
+    >>> grid(dicts)
+    {'a': array([4, 4, 5, 5]), 'b': array([2, 3, 2, 3]),
+     'c': array([6, 7, 6, 7])}
+    """
+    out = {}
+    if not dicts:
+        return to_structured(out) if structured else out
+    if not all(dicts):
+        raise ValueError("The dictionaries must not be empty.")
+    lengths = [len(next(iter(dct.values()))) for dct in dicts]
+    indices = np.unravel_index(np.arange(prod(lengths)), lengths)
+    for dct, ind in zip(dicts, indices):
+        for k, v in dct.items():
+            out[k] = np.asarray(v)[ind]
+    if structured:
+        return to_structured(out)
+    return out
+
+
+def grid_from_dict(dct: dict, structured: bool = False) -> dict:
+    """Columnar equivalent of `combinations_from_dict`
+
+    >>> grid_from_dict({'b': [2, 3], 'c': [6, 7]})
+    {'b': array([2, 2, 3, 3]), 'c': array([6, 7, 6, 7])}
+    """
+    return grid([{k: v} for k, v in dct.items()], structured=structured)
+
+
+def to_structured(columns: dict) -> np.ndarray:
+    """Convert a dictionary of equal length np.arrays to a structured array"""
+    dtype = [(k, v.dtype, v.shape[1:]) for k, v in columns.items()]
+    n = len(next(iter(columns.values()))) if columns else 0
+    out = np.empty(n, dtype=dtype)
+    for k, v in columns.items():
+        out[k] = v
+    return out
+
+
+def _columns(grid: typing.Union[dict, np.ndarray]) -> dict:
+    if isinstance(grid, np.ndarray):
+        return {name: grid[name] for name in grid.dtype.names}
+    return grid
+
+
+def iterate_batches(
+    func: typing.Callable,
+    context: context.Context,
+    grid: typing.Union[dict, np.ndarray],
+    batch_size: int = None,
 ) -> list:
-    """Call a function with a context updated with each update_dict
+    """Call a vectorized function with batches of grid rows
+
+    Each call gets a context updated with a batch of rows, so each swept
+    key holds an np.array rather than a scalar. The second argument is the
+    batch as a dictionary of np.arrays.
+
+    Args:
+        func (callable): A function that accepts a context and a dictionary
+            of np.arrays.
+        context (Context): The base context.
+        grid (dict or np.ndarray): A grid from `grid` or `grid_from_dict`.
+        batch_size (int): [Optional] The number of rows per call, which
+            must be at least 1. If None (default), all rows are passed in one
+            call.
 
     Returns:
-        A list of return values.
+        A list of return values, one per batch.
+    """
+    if batch_size is not None and batch_size < 1:
+        raise ValueError("batch_size must be at least 1.")
+    columns = _columns(grid)
+    n = len(next(iter(columns.values()))) if columns else 0
+    batch_size = max(n, 1) if batch_size is None else batch_size
+    returns = []
+    for start in range(0, n, batch_size):
+        batch = {k: v[start : start + batch_size] for k, v in columns.items()}
+        loop_context = context.with_values(batch, safe=True)
+        returns.append(func(loop_context, batch))
+    return returns
+
+
+class Combinations(Sequence):
+    """A lazy, random-access sequence of update_dicts
+
+    Update dicts are built on demand, in the same order as
+    `combinations_from_lists`, so large grids need not fit in memory.
+    Indexing decodes the index in mixed radix, which costs O(k) for k
+    sublists. Slicing returns another Combinations instance.
+
+    Args:
+        lst (list[list[dict]]): A list of sublists of dicts, as for
+            `combinations_from_lists`.
+
+    >>> combs = Combinations.from_dict({'b': [2, 3], 'c': [6, 7]})
+    >>> len(combs)
+    4
+    >>> combs[1]
+    {'b': 2, 'c': 7}
     """
+
+    def __init__(self, lst: list[list[dict]], indices: range = None):
+        self._lst = [list(sublist) for sublist in lst]
+        self._sizes = [len(sublist) for sublist in self._lst]
+        n = prod(self._sizes)
+        self._indices = range(n) if indices is None else indices
+
+    @classmethod
+    def from_lists(cls, lst: list[list[dict]]) -> Combinations:
+        """Equivalent to `combinations_from_lists`"""
+        return cls(lst)
+
+    @classmethod
+    def from_dict(cls, dct: dict) -> Combinations:
+        """Equivalent to `combinations_from_dict`"""
+        return cls([[{k: v} for v in vals] for k, vals in dct.items()])
+
+    @classmethod
+    def from_dicts(cls, dicts: list[dict]) -> Combinations:
+        """Equivalent to `combinations`"""
+        return cls([dlist(dct) for dct in dicts])
+
+    def __len__(self) -> int:
+        return len(self._indices)
+
+    def _decode(self, i: int) -> dict:
+        positions = []
+        for size in reversed(self._sizes):
+            i, position = divmod(i, size)
+            positions.append(position)
+        out = {}
+        for sublist, position in zip(self._lst, reversed(positions)):
+            out.update(sublist[position])
+        return out
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return Combinations(self._lst, self._indices[i])
+        return self._decode(self._indices[i])
+
+    def __iter__(self):
+        if self._indices == range(prod(self._sizes)):
+            for tup in product(*self._lst):
+                yield {k: v for dct in tup for k, v in dct.items()}
+        else:
+            for i in self._indices:
+                yield self._decode(i)
+
+    def __repr__(self) -> str:
+        return "Combinations(n=" + str(len(self)) + ")"
+
+
+def _run_chunk(
+    func: typing.Callable, context: context.Context, update_dicts: list[dict]
+) -> list:
     returns = []
     for update_dict in update_dicts:
         loop_context = context.with_values(update_dict, safe=True)
         returns.append(func(loop_context, update_dict))
     return returns
+
+
+def _reduce_chunk(
+    func: typing.Callable,
+    context: context.Context,
+    reducer: Reducer,
+    update_dicts: typing.Iterable[dict],
+):
+    acc = reducer.initial()
+    for update_dict in update_dicts:
+        loop_context = context.with_values(update_dict, safe=True)
+        acc = reducer.step(acc, update_dict, func(loop_context, update_dict))
+    return acc
+
+
+def _chunks(update_dicts: typing.Iterable[dict], chunksize: int):
+    it = iter(update_dicts)
+    while True:
+        chunk = list(islice(it, chunksize))
+        if not chunk:
+            return
+        yield chunk
+
+
+_worker = {}
+
+
+def _init_worker(chunk_func: typing.Callable, args: tuple) -> None:
+    _worker["func"] = partial(chunk_func, *args)
+
+
+def _call_worker(chunk: list):
+    return _worker["func"](chunk)
+
+
+def _map_chunks(
+    chunk_func: typing.Callable,
+    args: tuple,
+    update_dicts: typing.Iterable[dict],
+    workers: int,
+    executor: typing.Union[str, Executor],
+    chunksize: int,
+    ordered: bool,
+):
+    """Yield (chunk, chunk_func(*args, chunk)) pairs evaluated in a pool
+
+    At most two chunks per worker are in flight at any time, so lazy
+    update_dicts are only consumed as fast as they are evaluated. Process
+    pools created here receive the args once per worker, rather than with
+    every chunk.
+    """
+    func = partial(chunk_func, *args)
+    if isinstance(executor, Executor):
+        pool = executor
+    elif issubclass(EXECUTORS[executor], ProcessPoolExecutor):
+        pool = EXECUTORS[executor](
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(chunk_func, args),
+        )
+        func = _call_worker
+    else:
+        pool = EXECUTORS[executor](max_workers=workers)
+    chunks = _chunks(update_dicts, chunksize)
+    pending = deque()
+
+    def submit(n):
+        for chunk in islice(chunks, n):
+            future = pool.submit(func, chunk)
+            future.chunk = chunk
+            pending.append(future)
+
+    try:
+        submit(2 * workers)
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                ret = future.result()
+                submit(1)
+                yield future.chunk, ret
+    finally:
+        for future in pending:
+            future.cancel()
+        if pool is not executor:
+            pool.shutdown(wait=True)
+
+
+def _prepare(
+    func: typing.Callable, context: context.Context, cache: Result_Cache
+) -> typing.Callable:
+    if cache is None:
+        return func
+    context.fingerprint  # Compute once so loop contexts update it
+    return cache.wrap(func)
+
+
+def _evaluate(
+    func: typing.Callable,
+    context: context.Context,
+    update_dicts: typing.Iterable[dict],
+    workers: int = None,
+    executor: typing.Union[str, Executor] = "thread",
+    chunksize: int = 1,
+    ordered: bool = True,
+    cache: Result_Cache = None,
+):
+    """Yield (update_dict, return value) pairs"""
+    func = _prepare(func, context, cache)
+    if workers is None:
+        for update_dict in update_dicts:
+            loop_context = context.with_values(update_dict, safe=True)
+            yield update_dict, func(loop_context, update_dict)
+        return
+    mapped = _map_chunks(
+        _run_chunk,
+        (func, context),
+        update_dicts,
+        workers,
+        executor,
+        chunksize,
+        ordered,
+    )
+    try:
+        for chunk, returns in mapped:
+            yield from zip(chunk, returns)
+    finally:
+        mapped.close()
+
+
+def _reduce(
+    func: typing.Callable,
+    context: context.Context,
+    update_dicts: typing.Iterable[dict],
+    reducer: Reducer,
+    workers: int = None,
+    executor: typing.Union[str, Executor] = "thread",
+    chunksize: int = 1,
+    ordered: bool = True,
+    cache: Result_Cache = None,
+):
+    """Fold return values with a reducer
+
+    With workers, each chunk is reduced in its worker and the chunk
+    accumulators are combined in a tree.
+    """
+    func = _prepare(func, context, cache)
+    if workers is None:
+        acc = _reduce_chunk(func, context, reducer, update_dicts)
+        return reducer.finish(acc)
+    tree = Tree(reducer)
+    mapped = _map_chunks(
+        _reduce_chunk,
+        (func, context, reducer),
+        update_dicts,
+        workers,
+        executor,
+        chunksize,
+        ordered,
+    )
+    try:
+        for chunk, acc in mapped:
+            tree.push(acc)
+    finally:
+        mapped.close()
+    return reducer.finish(tree.result())
+
+
+def iterate(
+    func: typing.Callable,
+    context: context.Context,
+    update_dicts: typing.Iterable[dict],
+    workers: int = None,
+    executor: typing.Union[str, Executor] = "thread",
+    chunksize: int = 1,
+    ordered: bool = True,
+    cache: Result_Cache = None,
+    reduce: Reducer = None,
+) -> list:
+    """Call a function with a context updated with each update_dict
+
+    Args:
+        func (callable): A function that accepts a context and an update_dict.
+        context (Context): The base context.
+        update_dicts (iterable): A list of update_dicts or a Combinations
+            instance.
+        workers (int): [Optional] The number of workers to evaluate the
+            function with. If None (default), calls are made serially.
+        executor (str or Executor): [Optional] 'thread' (default) or
+            'process' to choose the type of pool, or an existing
+            concurrent.futures Executor instance.
+        chunksize (int): [Optional] The number of update_dicts sent to a
+            worker at a time.
+        ordered (bool): [Optional] If False, (update_dict, return value)
+            pairs are returned in the order they complete.
+        cache (Result_Cache): [Optional] A cache of return values. Calls for
+            contexts already in the cache are skipped.
+        reduce (Reducer): [Optional] A reducer from the `reducers` module.
+            If given, return values are folded as they arrive and the
+            reduced value is returned instead of a list.
+
+    Note:
+        For the 'process' executor, the function and context must be
+        picklable. They are sent to each worker once. With an existing
+        Executor instance, they are sent with every chunk.
+
+    Returns:
+        A list of return values, or of (update_dict, return value) pairs if
+        ordered is False.
+    """
+    if reduce is not None:
+        return _reduce(
+            func,
+            context,
+            update_dicts,
+            reduce,
+            workers=workers,
+            executor=executor,
+            chunksize=chunksize,
+            ordered=ordered,
+            cache=cache,
+        )
+    evaluated = _evaluate(
+        func,
+        context,
+        update_dicts,
+        workers=workers,
+        executor=executor,
+        chunksize=chunksize,
+        ordered=ordered,
+        cache=cache,
+    )
+    if not ordered:
+        return list(evaluated)
+    return [ret for update_dict, ret in evaluated]
+
+
+def iterate_stream(
+    func: typing.Callable,
+    context: context.Context,
+    update_dicts: typing.Iterable[dict],
+    sink: Sink = None,
+    **kwargs,
+):
+    """Yield (update_dict, return value) pairs as they are evaluated
+
+    Unlike `iterate`, return values are not kept in memory.
+
+    Args:
+        func (callable): A function that accepts a context and an update_dict.
+        context (Context): The base context.
+        update_dicts (iterable): A list of update_dicts or a Combinations
+            instance.
+        sink (Sink): [Optional] A sink from the `results` module that each
+            pair is also written to. It is flushed when the iteration ends.
+
+    Other keyword arguments are passed to `iterate`.
+
+    >>> with results.Jsonl_Sink('sweep.jsonl') as sink:
+    ...     for update_dict, ret in iterate_stream(func, c, combs, sink=sink):
+    ...         pass
+    """
+    evaluated = _evaluate(func, context, update_dicts, **kwargs)
+    try:
+        for update_dict, ret in evaluated:
+            if sink is not None:
+                sink.write(update_dict, ret)
+            yield update_dict, ret
+    finally:
+        evaluated.close()
+        if sink is not None:
+            sink.flush()
+
+
+async def aiterate(
+    func: typing.Callable,
+    context: context.Context,
+    update_dicts: typing.Iterable[dict],
+    concurrency: int = 8,
+):
+    """Await a coroutine function with a context updated with each update_dict
+
+    This is an asynchronous generator. Up to `concurrency` calls run at once
+    and return values are yielded in the order of update_dicts. If the
+    generator is closed or cancelled, calls still in progress are cancelled.
+
+    Args:
+        func (callable): A coroutine function that accepts a context and an
+            update_dict.
+        context (Context): The base context.
+        update_dicts (iterable): A list of update_dicts or a Combinations
+            instance.
+        concurrency (int): [Optional] The maximum number of calls in
+            progress at once.
+
+    >>> returns = [ret async for ret in aiterate(func, context, update_dicts)]
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def call(update_dict):
+        async with semaphore:
+            loop_context = context.with_values(update_dict, safe=True)
+            return await func(loop_context, update_dict)
+
+    it = iter(update_dicts)
+    pending = deque()
+
+    def start(n):
+        for update_dict in islice(it, n):
+            pending.append(asyncio.ensure_future(call(update_dict)))
+
+    try:
+        start(2 * concurrency)
+        while pending:
+            ret = await pending.popleft()
+            start(1)
+            yield ret
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:31:05 2026
+
+@author: Reuben
+
+Containers with array values in shared memory, for process pools.
+
+A Shared_Memory_Manager copies the array values of a container into
+`multiprocessing.shared_memory` blocks once. The Shared_Container it returns
+pickles only small handles for those values, so sending it to process pool
+workers doesn't copy the arrays. Workers attach read-only views of the same
+memory. The manager unlinks the blocks when it is closed.
+
+>>> with Shared_Memory_Manager() as manager:
+...     shared = manager.share(container)
+...     with ProcessPoolExecutor(64) as pool:
+...         pool.map(func, [shared] * 64)
+
+"""
+
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .container import Container, _restore
+
+_attached = {}
+
+
+class Shared_Array:
+    """A picklable handle to an np.array in shared memory"""
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    def attach(self):
+        """Return a read-only np.array view of the shared memory"""
+        shm = _attached.get(self.name)
+        if shm is None:
+            shm = shared_memory.SharedMemory(name=self.name)
+            _attached[self.name] = shm  # Keep the buffer open
+        arr = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+        arr.flags.writeable = False
+        return arr
+
+
+def _restore_shared(cls, dct, state):
+    handles = {}
+    views = {}
+    for key, val in dct.items():
+        if isinstance(val, Shared_Array):
+            dct[key] = views[val.name] = val.attach()
+            handles[key] = (dct[key], val)
+    backup = state["_backup"]
+    for key, val in backup.items():
+        if isinstance(val, Shared_Array):
+            view = views.get(val.name)
+            backup[key] = val.attach() if view is None else view
+    new = _restore(cls, dct, state)
+    new._handles = handles
+    return new
+
+
+class Shared_Container(Container):
+    """A Container that pickles its shared array values as handles
+
+    Create instances with `Shared_Memory_Manager.share`. Shared values are
+    read-only np.arrays. Values set later are pickled normally. Copies
+    keep the handles, so they are also pickled cheaply.
+    """
+
+    def __reduce__(self):
+        dct = dict.copy(self)
+        state = self._state()
+        state["_handles"] = {}  # Recreated by _restore_shared
+        backup = state["_backup"] = dict(state["_backup"])
+        for key, (arr, handle) in self._handles.items():
+            if dct.get(key) is arr:
+                dct[key] = handle
+            if backup.get(key) is arr:
+                backup[key] = handle
+        return (_restore_shared, (type(self), dct, state))
+
+
+def _cleanup(blocks):
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # Views still exist. The memory is freed when they are.
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+    blocks.clear()
+
+
+class Shared_Memory_Manager:
+    """Creates and owns the shared memory blocks for Shared_Containers
+
+    Args:
+        min_bytes (int): [Optional] Arrays smaller than this are not shared.
+        lists (bool): [Optional] If true, numeric list values are converted
+            to np.arrays and shared too.
+
+    Note:
+        The blocks are unlinked by `close`, at the end of a `with` block,
+        or when the manager is garbage collected.
+    """
+
+    def __init__(self, min_bytes=1024, lists=False):
+        self.min_bytes = min_bytes
+        self.lists = lists
+        self._blocks = []
+        self._finalizer = weakref.finalize(self, _cleanup, self._blocks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Unlink all shared memory blocks"""
+        self._finalizer()
+
+    def _as_array(self, val):
+        if isinstance(val, np.ndarray):
+            arr = val
+        elif self.lists and isinstance(val, list):
+            arr = np.asarray(val)
+            if not np.issubdtype(arr.dtype, np.number):
+                return None
+        else:
+            return None
+        if arr.dtype.hasobject or arr.nbytes < self.min_bytes:
+            return None
+        return arr
+
+    def share_array(self, arr):
+        """Copy an np.array into shared memory
+
+        Returns:
+            tuple: The read-only np.array view and its Shared_Array handle.
+        """
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        self._blocks.append(shm)
+        view = np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)
+        view[...] = arr
+        view.flags.writeable = False
+        return view, Shared_Array(shm.name, arr.shape, arr.dtype.str)
+
+    def share(self, container):
+        """Return a Shared_Container copy with arrays in shared memory"""
+        dct = dict.copy(container)
+        backup = container._backup.copy()
+        handles = {}
+        for key, val in dct.items():
+            arr = self._as_array(val)
+            if arr is None:
+                continue
+            view, handle = self.share_array(arr)
+            dct[key] = view
+            handles[key] = (view, handle)
+            if backup.get(key) is val:
+                backup[key] = view  # Share rather than copy the backup
+        shared = _restore(Shared_Container, dct, container._state())
+        shared._backup = backup
+        shared._locks = container._locks.copy()
+        shared._handles = handles
+        return shared
@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:10:26 2026
+
+@author: Reuben
+
+A Container that can be shared between threads.
+
+Writes to the shared values take a reader-writer lock. Changes made with
+`context` go into an overlay layer that is private to the current thread or
+asyncio task (using contextvars), so several threads can sweep the same
+container at once. Reading a value checks the overlays first, without
+taking a lock.
+
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import MappingProxyType
+
+from .container import Container, MISSING
+
+# The overlay layers of each Concurrent_Container, keyed by the container's
+# overlay key. The dictionary is replaced, never changed, so each thread and
+# asyncio task sees its own.
+_overlays = ContextVar("vartrix_overlays", default=MappingProxyType({}))
+
+
+class RW_Lock:
+    """A reader-writer lock that prefers writers
+
+    Any number of readers can hold the lock at once, or one writer. The
+    writer can acquire the lock again, for reading or writing.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writes = 0
+        self._waiting = 0
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                while self._writer is not None or self._waiting:
+                    self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                self._waiting += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._waiting -= 1
+                self._writer = me
+            self._writes += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writes -= 1
+                if not self._writes:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+class Concurrent_Container(Container):
+    """A Container with locked shared writes and per-thread overlays
+
+    Args:
+        dct (dict): A dictionary (possibly nested) of key-value pairs to use.
+
+    Note:
+        Within `context`, `set` and `dset` change only the current thread's
+        (or asyncio task's) overlay. Outside of any context, they change the
+        shared values under the write lock. Deleting keys, with `del`,
+        `pop`, `popitem` or `clear`, is not allowed within a context.
+
+        Item access, `get`, `in` and `to_dict` include the overlay values.
+        Iteration, `keys`, `items`, `values`, `subtree`, `select`, `copy`
+        and `snapshot` return only the shared values.
+    """
+
+    def __init__(self, dct=None, **kwargs):
+        self._init_concurrency()
+        super().__init__(dct, **kwargs)
+
+    def _init_concurrency(self):
+        self._lock = RW_Lock()
+        self._overlay_key = object()
+
+    def _state(self):
+        state = super()._state()
+        del state["_lock"]
+        del state["_overlay_key"]
+        return state
+
+    def _set_state(self, state):
+        super()._set_state(state)
+        self._init_concurrency()
+
+    def _layers(self):
+        return _overlays.get().get(self._overlay_key, ())
+
+    def _set_layers(self, layers):
+        overlays = dict(_overlays.get())
+        if layers:
+            overlays[self._overlay_key] = layers
+        else:
+            overlays.pop(self._overlay_key, None)
+        _overlays.set(overlays)
+
+    def _find(self, key):
+        for layer in reversed(self._layers()):
+            if key in layer:
+                return layer[key]
+        return MISSING
+
+    def __getitem__(self, key):
+        val = self._find(key)
+        if val is MISSING:
+            return dict.__getitem__(self, key)
+        return val
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        if self._find(key) is not MISSING:
+            return True
+        return dict.__contains__(self, key)
+
+    def _overlay_write(self, d):
+        layers = self._layers()
+        top = dict(layers[-1])
+        top.update(d)
+        self._set_layers(layers[:-1] + (top,))
+
+    def __setitem__(self, key, val):
+        if self._layers():
+            self._overlay_write({key: val})
+        else:
+            with self._lock.write():
+                super().__setitem__(key, val)
+
+    def update(self, *args, **kwargs):
+        if self._layers():
+            self._overlay_write(dict(*args, **kwargs))
+        else:
+            with self._lock.write():
+                super().update(*args, **kwargs)
+
+    def _check_shared(self, action):
+        if self._layers():
+            raise RuntimeError("Cannot " + action + " within a context.")
+
+    def __delitem__(self, key):
+        self._check_shared("delete keys")
+        with self._lock.write():
+            super().__delitem__(key)
+
+    def clear(self):
+        self._check_shared("clear")
+        with self._lock.write():
+            super().clear()
+
+    def pop(self, key, *default):
+        self._check_shared("pop")
+        with self._lock.write():
+            return super().pop(key, *default)
+
+    def popitem(self):
+        self._check_shared("popitem")
+        with self._lock.write():
+            return super().popitem()
+
+    def setdefault(self, key, default=None):
+        with self._writing():
+            return super().setdefault(key, default)
+
+    @contextmanager
+    def _writing(self):
+        if self._layers():
+            yield
+        else:
+            with self._lock.write():
+                yield
+
+    def set(self, key, val, safe=False):
+        with self._writing():
+            super().set(key, val, safe=safe)
+
+    def dset(self, dct, safe=False, update_backup=False):
+        with self._writing():
+            super().dset(dct, safe=safe, update_backup=update_backup)
+
+    def lock(self, key):
+        with self._lock.write():
+            super().lock(key)
+
+    def unlock(self, key):
+        with self._lock.write():
+            super().unlock(key)
+
+    def load(self, dct):
+        self._check_shared("load")
+        with self._lock.write():
+            super().load(dct)
+
+    def reset(self):
+        self._check_shared("reset")
+        with self._lock.write():
+            super().reset()
+
+    def add(self, dct):
+        with self._lock.write():
+            super().add(dct)
+
+    def restore(self, snapshot):
+        with self._lock.write():
+            super().restore(snapshot)
+
+    def copy(self):
+        with self._lock.read():
+            return super().copy()
+
+    def snapshot(self):
+        with self._lock.read():
+            return super().snapshot()
+
+    def to_dict(self):
+        with self._lock.read():
+            d = dict(self.items())
+        for layer in self._layers():
+            d.update(layer)
+        return d
+
+    @contextmanager
+    def context(self, dct, safe=True):
+        """A context manager for temporary changes in values
+
+        The changes, and any made within the block, are only seen by the
+        current thread or asyncio task.
+
+        Args:
+            dct (dict): A dictionary of dotkey-value pairs.
+            safe (bool): [Optional] set to false to ignore locks. Keys
+                must already exist in the container.
+        """
+        for k in dct.keys():
+            if self._aliases[k] not in self:
+                raise KeyError(
+                    "Key '"
+                    + k
+                    + "' was missing. "
+                    + "Keys must already exist to use context."
+                )
+        layers = self._layers()
+        self._set_layers(layers + ({},))
+        try:
+            self.dset(dct, safe=safe)
+            yield self
+        finally:
+            self._set_layers(layers)
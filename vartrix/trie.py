@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:40:12 2026
+
+@author: Reuben
+
+A trie over the dot-separated segments of dotkeys.
+
+Each node represents a dotkey prefix such as 'A' or 'A.b' and holds a set of
+items. Finding the items for every prefix of a dotkey costs O(key depth).
+
+"""
+
+from fnmatch import fnmatchcase
+
+WILDCARDS = set("*?[")
+
+
+def segments(dotkey):
+    """Split a dotkey or prefix into its segments
+
+    A trailing dot is ignored, so 'A.' and 'A' are the same prefix. An empty
+    string is the root, which is a prefix of every dotkey.
+    """
+    dotkey = dotkey[:-1] if dotkey.endswith(".") else dotkey
+    return dotkey.split(".") if dotkey else []
+
+
+class Node:
+    __slots__ = ("children", "items")
+
+    def __init__(self):
+        self.children = {}
+        self.items = set()
+
+
+class Dotkey_Trie:
+    """A trie over the dot-separated segments of dotkeys"""
+
+    def __init__(self):
+        self._root = Node()
+
+    def add(self, dotkey, item):
+        """Add an item to the node for a dotkey"""
+        node = self._root
+        for segment in segments(dotkey):
+            child = node.children.get(segment)
+            if child is None:
+                child = node.children[segment] = Node()
+            node = child
+        node.items.add(item)
+
+    def discard(self, dotkey, item):
+        """Remove an item from the node for a dotkey, if present"""
+        path = [self._root]
+        segs = segments(dotkey)
+        for segment in segs:
+            node = path[-1].children.get(segment)
+            if node is None:
+                return
+            path.append(node)
+        path[-1].items.discard(item)
+        for segment, parent, node in zip(
+            reversed(segs), reversed(path[:-1]), reversed(path)
+        ):
+            if node.items or node.children:
+                break
+            del parent.children[segment]
+
+    def find(self, dotkey):
+        """Return the node for a dotkey, or None"""
+        node = self._root
+        for segment in segments(dotkey):
+            node = node.children.get(segment)
+            if node is None:
+                return None
+        return node
+
+    def along(self, dotkey):
+        """Yield the items at each node from the root to the dotkey"""
+        node = self._root
+        yield from node.items
+        for segment in segments(dotkey):
+            node = node.children.get(segment)
+            if node is None:
+                return
+            yield from node.items
+
+    def under(self, prefix):
+        """Yield the items at the node for a prefix and all nodes below it"""
+        node = self.find(prefix)
+        if node is None:
+            return
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            yield from node.items
+            stack.extend(reversed(node.children.values()))
+
+    def match(self, pattern):
+        """Yield the items at nodes that match a glob pattern
+
+        Each segment of the pattern is matched against one segment of the
+        dotkey with `fnmatch`, so '*.stiffness' matches 'A.stiffness' but not
+        'A.b.stiffness'. A '**' segment matches zero or more segments.
+        Literal segments are looked up directly rather than scanned.
+        """
+        pats = segments(pattern)
+        stack = [(self._root, 0)]
+        seen = set()
+        while stack:
+            node, i = stack.pop()
+            if (id(node), i) in seen:
+                continue
+            seen.add((id(node), i))
+            if i == len(pats):
+                yield from node.items
+                continue
+            pat = pats[i]
+            if pat == "**":
+                stack.append((node, i + 1))
+                for child in node.children.values():
+                    stack.append((child, i))
+            elif WILDCARDS.isdisjoint(pat):
+                child = node.children.get(pat)
+                if child is not None:
+                    stack.append((child, i + 1))
+            else:
+                for segment, child in node.children.items():
+                    if fnmatchcase(segment, pat):
+                        stack.append((child, i + 1))
+
+    def clear(self):
+        self._root = Node()
+
+    def __bool__(self):
+        return bool(self._root.items or self._root.children)
@@ -9,6 +9,9 @@ This module contains helper classes and functions.
 """
 
 import inspect, sys
+import hashlib
+import pickle
+from collections.abc import Mapping
 import numpy as np
 
 
@@ -147,6 +150,9 @@ def numpify(obj):
         return obj
 
 
+DENUMPIFY_TYPES = (np.ndarray, dict)
+
+
 def denumpify(obj):
     if isinstance(obj, np.ndarray):
         return obj.tolist()
@@ -154,3 +160,41 @@ def denumpify(obj):
         return {k: denumpify(v) for k, v in obj.items()}
     else:
         return obj
+
+
+def _feed(h, obj):
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.hasobject:
+            h.update(b"o")
+            _feed(h, obj.tolist())
+            return
+        h.update(b"a" + str(obj.dtype).encode() + str(obj.shape).encode())
+        h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, Mapping):
+        h.update(b"d" + str(len(obj)).encode())
+        for k in sorted(obj.keys(), key=repr):
+            _feed(h, k)
+            _feed(h, obj[k])
+    elif isinstance(obj, (list, tuple)):
+        h.update(b"l" + str(len(obj)).encode())
+        for v in obj:
+            _feed(h, v)
+    elif isinstance(obj, str):
+        h.update(b"s" + str(len(obj)).encode() + b":" + obj.encode())
+    elif isinstance(obj, (bool, int, float, complex, type(None))):
+        h.update(b"n" + repr(obj).encode() + b";")
+    else:
+        data = pickle.dumps(obj, protocol=4)
+        h.update(b"p" + str(len(data)).encode() + b":" + data)
+
+
+def stable_hash(obj):
+    """Return a hex digest of an object's contents
+
+    Unlike `hash`, the digest is the same between interpreter sessions. Dicts
+    are hashed independent of key order and np.arrays by dtype, shape and
+    data. Other objects are pickled.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    _feed(h, obj)
+    return h.hexdigest()